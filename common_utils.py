@@ -6,12 +6,19 @@ Shared functions and constants for flutter-dev tools
 
 import os
 import re
+import sys
 import time
+import select
 import platform
+import selectors
 import subprocess
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Platform name ("Windows", "Darwin", "Linux"), looked up once at import
+PLATFORM_SYSTEM = platform.system()
+
 # ============================================================================
 # COLOR CONSTANTS
 # ============================================================================
@@ -26,8 +33,11 @@ MAGENTA = '\033[0;35m'
 CHECKMARK = '\033[32m✓\033[0m'
 CROSS = '\033[31m✗\033[0m'
 
-# Disable colors on Windows CMD (unless using Windows Terminal)
-if platform.system() == "Windows" and not os.environ.get('WT_SESSION'):
+# Disable colors on Windows CMD (unless using Windows Terminal), when output
+# is redirected to a file or pipe, or when NO_COLOR is set (https://no-color.org)
+if ((PLATFORM_SYSTEM == "Windows" and not os.environ.get('WT_SESSION'))
+        or not sys.stdout.isatty()
+        or os.environ.get('NO_COLOR')):
     RED = GREEN = YELLOW = BLUE = NC = MAGENTA = ''
     CHECKMARK = '✓'
     CROSS = '✗'
@@ -62,6 +72,119 @@ def timer_decorator(func):
 # LOADING SPINNER
 # ============================================================================
 
+# Spinner frames and how often the spinner advances (seconds)
+SPINNER_FRAMES = '⡿⣟⣯⣷⣾⣽⣻⢿'
+SPINNER_INTERVAL = 0.08
+
+# Spinner frames pre-rendered (backspace + colour + frame) and encoded once
+_SPINNER_TEXT = [f"\b{MAGENTA}{frame}{NC}" for frame in SPINNER_FRAMES]
+_SPINNER_BYTES = [
+    frame.encode(getattr(sys.stdout, 'encoding', None) or 'utf-8', 'replace')
+    for frame in _SPINNER_TEXT
+]
+
+def _open_exit_waiter(process):
+    """
+    Set up an OS exit notification for a process
+    Uses pidfd on Linux, kqueue on macOS/BSD and Popen.wait (WaitForSingleObject
+    on Windows) elsewhere, so the caller sleeps in the kernel instead of polling
+    Parameters:
+        process: Popen object to watch
+    Returns:
+        (wait, close) - wait(timeout) returns True once the process has exited,
+        close() releases the notification handle
+    """
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            pass
+        else:
+            selector = selectors.DefaultSelector()
+            selector.register(pidfd, selectors.EVENT_READ)
+
+            def close_pidfd():
+                selector.close()
+                os.close(pidfd)
+            return (lambda timeout: bool(selector.select(timeout))), close_pidfd
+
+    if hasattr(select, 'kqueue'):
+        kq = select.kqueue()
+        try:
+            kq.control([select.kevent(
+                process.pid,
+                filter=select.KQ_FILTER_PROC,
+                flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                fflags=select.KQ_NOTE_EXIT
+            )], 0, 0)
+        except ProcessLookupError:
+            # Already exited before we could register
+            kq.close()
+            return (lambda timeout: True), (lambda: None)
+        except OSError:
+            kq.close()
+        else:
+            return (lambda timeout: bool(kq.control(None, 1, timeout))), kq.close
+
+    def wait_process(timeout):
+        try:
+            process.wait(timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    return wait_process, (lambda: None)
+
+def spin_until(wait, interval=SPINNER_INTERVAL):
+    """
+    Draw the braille spinner until wait(interval) returns True
+    Parameters:
+        wait: Callable taking a timeout in seconds, returns True when done
+        interval: Seconds between spinner frames
+    """
+    # Write the encoded frames straight to the byte stream when there is one
+    out = getattr(sys.stdout, 'buffer', None)
+    frames = _SPINNER_BYTES if out is not None else _SPINNER_TEXT
+    out = out or sys.stdout
+    sys.stdout.flush()
+
+    spinner_index = 0
+    while True:
+        out.write(frames[spinner_index])
+        out.flush()
+        spinner_index = (spinner_index + 1) % len(frames)
+        if wait(interval):
+            break
+
+def wait_with_spinner(process, interval=SPINNER_INTERVAL):
+    """
+    Draw the braille spinner until process exits, waking only every interval
+    to advance the frame
+    Parameters:
+        process: Popen object to wait for
+        interval: Seconds between spinner frames
+    """
+    wait, close = _open_exit_waiter(process)
+    try:
+        spin_until(wait, interval)
+    finally:
+        close()
+
+def communicate_with_spinner(process, interval=SPINNER_INTERVAL):
+    """
+    Draw the spinner until process exits and return its output.
+    stdout/stderr are drained on a background thread while we wait, so a
+    process writing more than a pipe buffer's worth can't block forever.
+    Parameters:
+        process: Popen object started with stdout/stderr pipes
+        interval: Seconds between spinner frames
+    Returns:
+        (stdout, stderr) tuple, as from process.communicate()
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        output = executor.submit(process.communicate)
+        wait_with_spinner(process, interval)
+        return output.result()
+
 def show_loading(description, process):
     """
     Displays a loading spinner with a custom message while a process is running
@@ -69,15 +192,9 @@ def show_loading(description, process):
         description: Description message to display
         process: Process object to monitor
     """
-    spinner_index = 0
-    braille_spinner_list = '⡿⣟⣯⣷⣾⣽⣻⢿'
     print(description, end='', flush=True)
     # Continue spinning while the process is running
-    while process.poll() is None:
-        print(f"\b{MAGENTA}{braille_spinner_list[spinner_index]}{NC}", end='', flush=True)
-        spinner_index = (spinner_index + 1) % len(braille_spinner_list)
-        time.sleep(0.025)
-    stdout, stderr = process.communicate()
+    stdout, stderr = communicate_with_spinner(process)
     # Display success or failure icon based on the process exit status
     if process.returncode == 0:
         print(f"\b{CHECKMARK} ", flush=True)
@@ -103,7 +220,7 @@ def run_command_with_spinner(cmd_list, description):
     Returns:
         True if successful, False otherwise
     """
-    shell_needed = platform.system() == "Windows"
+    shell_needed = PLATFORM_SYSTEM == "Windows"
 
     process = subprocess.Popen(
         cmd_list,
@@ -119,6 +236,38 @@ def run_command_with_spinner(cmd_list, description):
 # ENVIRONMENT FILE OPERATIONS
 # ============================================================================
 
+def load_env_file(env_file=".env"):
+    """
+    Load KEY=value lines from a .env file into os.environ.
+    Variables that are already set in the environment are not overridden.
+    Parameters:
+        env_file: Path to .env file (default: ".env")
+    Returns:
+        True if the file was found and read, False otherwise
+    """
+    try:
+        with open(env_file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return False
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        if line.startswith('export '):
+            line = line[len('export '):]
+
+        key, _, value = line.partition('=')
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+            value = value[1:-1]
+        elif ' #' in value:
+            # Drop inline comments from unquoted values
+            value = value.split(' #', 1)[0].rstrip()
+        os.environ.setdefault(key.strip(), value)
+    return True
+
 def read_env_value(key, env_file=".env"):
     """
     Read a value from .env file
@@ -148,20 +297,34 @@ def update_env_value(key, value, env_file=".env"):
     Returns:
         True if successful, False otherwise
     """
-    if not os.path.exists(env_file):
+    return update_env_values({key: value}, env_file)
+
+def update_env_values(updates, env_file=".env"):
+    """
+    Update several values in .env file with one read and one write
+    Parameters:
+        updates: Dict of environment variable keys to new values
+        env_file: Path to .env file (default: ".env")
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        with open(env_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except FileNotFoundError:
         print(f"{RED}❌ .env file not found!{NC}")
         return False
 
-    with open(env_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Replace each value using regex
+    new_content = content
+    for key, value in updates.items():
+        pattern = f"^{re.escape(key)}=.*$"
+        replacement = f"{key}={value}"
+        new_content = re.sub(pattern, lambda _: replacement, new_content, flags=re.MULTILINE)
 
-    # Replace the value using regex
-    pattern = f"^{key}=.*$"
-    replacement = f"{key}={value}"
-    new_content = re.sub(pattern, replacement, content, flags=re.MULTILINE)
-
-    with open(env_file, 'w', encoding='utf-8') as f:
-        f.write(new_content)
+    if new_content != content:
+        with open(env_file, 'w', encoding='utf-8') as f:
+            f.write(new_content)
 
     return True
 
@@ -171,15 +334,15 @@ def update_env_value(key, value, env_file=".env"):
 
 def is_windows():
     """Check if running on Windows"""
-    return platform.system() == "Windows"
+    return PLATFORM_SYSTEM == "Windows"
 
 def is_macos():
     """Check if running on macOS"""
-    return platform.system() == "Darwin"
+    return PLATFORM_SYSTEM == "Darwin"
 
 def is_linux():
     """Check if running on Linux"""
-    return platform.system() == "Linux"
+    return PLATFORM_SYSTEM == "Linux"
 
 def get_user_shell():
     """
@@ -209,6 +372,13 @@ def get_user_shell():
 # FILE/DIRECTORY OPERATIONS
 # ============================================================================
 
+# Command used to open a file with the default application, per platform
+FILE_OPENERS = {
+    "Darwin": ['open'],
+    "Linux": ['xdg-open'],
+    "Windows": ['notepad'],
+}
+
 def open_file_with_default_app(file_path):
     """
     Open file with default application based on platform
@@ -217,16 +387,20 @@ def open_file_with_default_app(file_path):
     Returns:
         True if successful, False otherwise
     """
+    opener = FILE_OPENERS.get(PLATFORM_SYSTEM)
+    if opener is None:
+        print(f"{YELLOW}Please manually open: {file_path}{NC}")
+        return False
+
     try:
-        if is_macos():
-            subprocess.run(['open', file_path])
-        elif is_linux():
-            subprocess.run(['xdg-open', file_path])
-        elif is_windows():
-            subprocess.run(['notepad', file_path])
-        else:
-            print(f"{YELLOW}Please manually open: {file_path}{NC}")
-            return False
+        # Launch the editor detached and don't wait for it - the caller
+        # doesn't need its output or exit status
+        subprocess.Popen(
+            opener + [file_path],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
         return True
     except Exception as e:
         print(f"{RED}Error opening file: {e}{NC}")
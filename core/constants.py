@@ -7,18 +7,27 @@ from pathlib import Path
 
 # Regex patterns (compiled once)
 PATTERNS = {
-    'package_name_kts': re.compile(r'applicationId\s*=\s*["\']([^"\']+)["\']'),
-    'package_name_groovy': re.compile(r'applicationId\s+["\']([^"\']+)["\']'),
-    'app_label': re.compile(r'android:label="([^"]+)"'),
+    # Bytes patterns - searched directly over memory-mapped project files
+    'package_name_kts': re.compile(rb'applicationId\s*=\s*["\']([^"\']+)["\']'),
+    'package_name_groovy': re.compile(rb'applicationId\s+["\']([^"\']+)["\']'),
+    'app_label': re.compile(rb'android:label="([^"]+)"'),
     'architecture': re.compile(r'(arm64-v8a|armeabi-v7a|x86|x86_64)'),
-    'version': re.compile(r'^version:\s*(.+)$', re.MULTILINE),
-    'version_with_build': re.compile(r'^version:\s*["\']?([\d\.]+)\+(\d+)["\']?', re.MULTILINE),
+    # pubspec.yaml 'version: 1.2.3+4' -> version ('1.2.3') and optional build ('4')
+    'pubspec_version': re.compile(r'^version:[ \t]*["\']?([^\s"\'+]+)(?:\+(\d+))?', re.MULTILINE),
+    # Tag like 'v1.2.3' or '1.2.3' -> major, minor, patch
+    'tag_version': re.compile(r'^v?(\d+)\.(\d+)\.(\d+)'),
     'version_line': re.compile(r'^version:\s*["\']?[\d\.]+(\+\d+)?["\']?', re.MULTILINE),
+    # 'adb devices -l' line of a ready device: serial and (optional) model
+    'adb_device': re.compile(r'^(\S+)[ \t]+device\b(?:[^\n]*?\bmodel:(\S+))?', re.MULTILINE),
+    # 'git merge' conflict line; the file is captured for content conflicts
+    # ("Merge conflict in <file>") and empty for other kinds (modify/delete, ...)
+    'merge_conflict': re.compile(r'^CONFLICT \([^)]*\): (?:Merge conflict in (.+))?', re.MULTILINE),
+    # Start of a non-blank commit message line (gets a "- " bullet prefix)
+    'commit_body_line': re.compile(r'^(?=[^\n]*\S)', re.MULTILINE),
     'ip_address': re.compile(r'inet (\d+\.\d+\.\d+\.\d+)'),
     'foreground_app': re.compile(r'u0 ([^/\s]+)'),
-    'resumed_activity': re.compile(r'mResumedActivity.*?{.*?u0\s+(\S+?)/'),
-    'top_resumed_activity': re.compile(r'(?:top)?ResumedActivity.*?u0\s+(\S+?)/'),
-    'sanitize_special': re.compile(r'[<>:"/\\|?*]'),
+    # mResumedActivity (older Android), topResumedActivity / ResumedActivity (newer)
+    'resumed_activity': re.compile(r'(?:m|top)?ResumedActivity.*?u0\s+(\S+?)/'),
     'sanitize_non_word': re.compile(r'[^\w\s-]'),
     'sanitize_spaces': re.compile(r'[-\s]+'),
 }
@@ -33,25 +42,27 @@ PATHS = {
     'apk_output': Path("build/app/outputs/flutter-apk"),
     'aab_output': Path("build/app/outputs/bundle/release"),
     'ipa_output': Path("build/ios/ipa"),
+    'build_fingerprint': Path(".dart_tool/fdev_build_fingerprint.json"),
+    'build_log': Path("build/last_build.log"),
 }
 
-# Build commands
+# Build commands (tuples - built once, passed straight to subprocess)
 BUILD_COMMANDS = {
-    'apk': [
+    'apk': (
         "flutter", "build", "apk", "--release", "--obfuscate",
         "--target-platform", "android-arm64", "--split-debug-info=./"
-    ],
-    'apk_split': [
+    ),
+    'apk_split': (
         "flutter", "build", "apk", "--release", "--split-per-abi",
         "--obfuscate", "--split-debug-info=./"
-    ],
-    'aab': [
+    ),
+    'aab': (
         "flutter", "build", "appbundle", "--release",
         "--obfuscate", "--split-debug-info=./"
-    ],
-    'ipa': [
+    ),
+    'ipa': (
         "flutter", "build", "ipa", "--release",
         "--obfuscate", "--split-debug-info=./",
         "--export-method", "app-store"
-    ],
+    ),
 }
@@ -64,6 +64,7 @@ def show_usage():
     print("  aab          Build release AAB")
     print("  ipa          Build IPA for App Store (macOS only)")
     print("  release-run  Build & install release APK on connected device")
+    print("    --force-clean  Run 'flutter clean' even if nothing changed since the last build")
 
     print(f"\n{BLUE}Development Commands:{NC}")
     print("  lang         Generate localization files")
@@ -125,16 +126,17 @@ def main():
     command = sys.argv[1].lower()
 
     # Build commands
+    force_clean = "--force-clean" in sys.argv
     if command == "apk":
-        build_apk()
+        build_apk(force_clean=force_clean)
     elif command == "apk-split":
-        build_apk_split_per_abi()
+        build_apk_split_per_abi(force_clean=force_clean)
     elif command == "aab":
-        build_aab()
+        build_aab(force_clean=force_clean)
     elif command == "ipa":
-        build_ipa()
+        build_ipa(force_clean=force_clean)
     elif command == "release-run":
-        release_run()
+        release_run(force_clean=force_clean)
 
     # Development commands
     elif command == "lang":
@@ -6,68 +6,220 @@ Supports: Groq, Mistral, SambaNova, OpenRouter
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 import re
 import time
+import random
+import hashlib
+import tempfile
+import threading
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dotenv import load_dotenv
+from dataclasses import dataclass
+from functools import lru_cache
 
 # Import common utilities
-from common_utils import RED, GREEN, YELLOW, BLUE, NC
+from common_utils import RED, GREEN, YELLOW, BLUE, NC, load_env_file
+
+# Prefer orjson for (de)serialization when available - it works on bytes
+# directly and is much faster on large diff payloads. orjson.JSONDecodeError
+# subclasses json.JSONDecodeError, so the existing except clauses cover both
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    _loads = json.loads
 
 # Load environment variables from .env file
 # First try to load from script's directory (for global installation)
 script_dir = Path(__file__).parent
 env_path = script_dir / '.env'
-if env_path.exists():
-    load_dotenv(env_path)
-else:
+if not load_env_file(env_path):
     # Fallback to current directory
-    load_dotenv()
+    load_env_file(Path.cwd() / '.env')
 
 # Load default AI service selection
 DEFAULT_AI_SERVICE = os.getenv("DEFAULT_AI_SERVICE", "groq").lower()
 
-# All AI service configurations
-AI_CONFIGS = {
-    "groq": {
-        "api_key": os.getenv("GROQ_API_KEY", ""),
-        "api_url": os.getenv("GROQ_API_URL", ""),
-        "model": os.getenv("GROQ_MODEL", "")
-    },
-    "mistral": {
-        "api_key": os.getenv("MISTRAL_API_KEY", ""),
-        "api_url": os.getenv("MISTRAL_API_URL", ""),
-        "model": os.getenv("MISTRAL_MODEL", "")
-    },
-    "sambanova": {
-        "api_key": os.getenv("SAMBANOVA_API_KEY", ""),
-        "api_url": os.getenv("SAMBANOVA_API_URL", ""),
-        "model": os.getenv("SAMBANOVA_MODEL", "")
-    },
-    "openrouter": {
-        "api_key": os.getenv("OPENROUTER_API_KEY", ""),
-        "api_url": os.getenv("OPENROUTER_API_URL", ""),
-        "model": os.getenv("OPENROUTER_MODEL", "")
-    }
+# Environment variables (api key, api url, model) for each AI service
+AI_SERVICE_ENV = {
+    "groq": ("GROQ_API_KEY", "GROQ_API_URL", "GROQ_MODEL"),
+    "mistral": ("MISTRAL_API_KEY", "MISTRAL_API_URL", "MISTRAL_MODEL"),
+    "sambanova": ("SAMBANOVA_API_KEY", "SAMBANOVA_API_URL", "SAMBANOVA_MODEL"),
+    "openrouter": ("OPENROUTER_API_KEY", "OPENROUTER_API_URL", "OPENROUTER_MODEL"),
 }
 
+
+@dataclass(frozen=True)
+class AIConfig:
+    """Connection settings for one AI service"""
+    __slots__ = ("api_key", "api_url", "model")
+    api_key: str
+    api_url: str
+    model: str
+
+
+def read_api_key(key_var):
+    """
+    Read an API key from <KEY_VAR>_FILE (e.g. a Docker/Kubernetes secret
+    mount) when set, otherwise from the <KEY_VAR> environment variable
+    """
+    key_file = os.getenv(f"{key_var}_FILE")
+    if key_file:
+        try:
+            return Path(key_file).read_text(encoding='utf-8').strip()
+        except OSError as e:
+            print(f"{RED}✗ Error: Could not read {key_var}_FILE - {e}{NC}")
+            return ""
+    return os.getenv(key_var, "")
+
+
+@lru_cache(maxsize=None)
+def get_ai_config(service):
+    """
+    Read the configuration of an AI service from the environment.
+    Only the services actually used are looked up, once each.
+    """
+    key_var, url_var, model_var = AI_SERVICE_ENV[service]
+    return AIConfig(read_api_key(key_var), os.getenv(url_var, ""), os.getenv(model_var, ""))
+
+
 # Validate selected service
-if DEFAULT_AI_SERVICE not in AI_CONFIGS:
+if DEFAULT_AI_SERVICE not in AI_SERVICE_ENV:
     print(f"{RED}✗ Error: Invalid AI service '{DEFAULT_AI_SERVICE}'{NC}")
-    print(f"{YELLOW}→ Available services: {', '.join(AI_CONFIGS.keys())}{NC}")
+    print(f"{YELLOW}→ Available services: {', '.join(AI_SERVICE_ENV.keys())}{NC}")
     exit(1)
 
 # Get current service config
-current_config = AI_CONFIGS[DEFAULT_AI_SERVICE]
+current_config = get_ai_config(DEFAULT_AI_SERVICE)
+
+# Service name as shown in messages, formatted once
+SERVICE_LABEL = DEFAULT_AI_SERVICE.upper()
+
+# Batched generation: diffs per request, and requests in flight at once
+AI_BATCH_SIZE = max(1, int(os.getenv("AI_BATCH_SIZE", "5")))
+AI_MAX_CONCURRENCY = max(1, int(os.getenv("AI_MAX_CONCURRENCY", "5")))
+
+# On-disk cache of generated commit messages, keyed by model + prompt + diff.
+# Set AI_COMMIT_CACHE=0 to disable
+COMMIT_CACHE_ENABLED = os.getenv("AI_COMMIT_CACHE", "1").lower() not in ("0", "false", "no", "off")
+COMMIT_CACHE_DIR = Path.home() / ".cache" / "flutter-dev-tools" / "commitmsg"
+COMMIT_CACHE_MAX_ENTRIES = 200
+
+# Circuit breaker: after this many consecutive 5xx/timeout/network failures,
+# skip requests to the service for CIRCUIT_OPEN_SECONDS. The state is kept in
+# the temp dir so it carries over between separate runs of the tool
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_OPEN_SECONDS = 60
+CIRCUIT_FILE = Path(tempfile.gettempdir()) / f"flutter-dev-tools-ai-circuit-{DEFAULT_AI_SERVICE}.json"
+
+# Diffs larger than this (in characters) are condensed before being sent
+AI_DIFF_MAX_CHARS = max(1000, int(os.getenv("AI_DIFF_MAX_CHARS", "32000")))
+# Hunks longer than this are reduced to a line count when condensing
+DIFF_MAX_HUNK_LINES = 40
 
 # Validate API key
-if not current_config["api_key"]:
-    print(f"{RED}✗ Error: API key not found for {DEFAULT_AI_SERVICE.upper()}{NC}")
-    print(f"{YELLOW}→ Please set {DEFAULT_AI_SERVICE.upper()}_API_KEY in .env file{NC}")
+if not current_config.api_key:
+    print(f"{RED}✗ Error: API key not found for {SERVICE_LABEL}{NC}")
+    print(f"{YELLOW}→ Please set {SERVICE_LABEL}_API_KEY (or {SERVICE_LABEL}_API_KEY_FILE) in .env file{NC}")
     exit(1)
 
+# Shared HTTP session so the TCP/TLS connection is kept alive and reused
+# across retries and across calls in the same process
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=max(4, AI_MAX_CONCURRENCY)))
+_SESSION.headers.update({
+    "Content-Type": "application/json",
+    "Authorization": f"Bearer {current_config.api_key}",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+})
+
+# Request fields shared by every call - only messages and max_tokens vary
+PAYLOAD_BASE = {
+    "model": current_config.model,
+    "temperature": 0.7
+}
+
+
+# Static parts of the commit message prompt. Built once at import so that
+# only the diff is concatenated per call, and the prefix stays byte-identical
+# between requests (lets provider-side prompt caching hit). The format rules
+# go in a system message shared by single and batched requests
+PROMPT_RULES = """<type>(<scope>): <short summary>
+<blank line>
+<body>
+<blank line>
+<footer>
+
+Rules:
+- Use one of these types: feat, fix, docs, style, refactor, test, chore
+- (scope) is optional but should describe the module/component (e.g., auth, cart, ui)
+- Summary should be short (max 50 chars) and in imperative form
+- Body (optional) should explain what and why, not how
+- Footer (optional) should include BREAKING CHANGE or issue references if applicable
+- Use proper emoticons where appropriate
+- Don't give any long boring texts, STRICTLY no explanations needed
+"""
+
+SYSTEM_PROMPT = ("You generate git commit messages following the Angular Conventional Commit format:\n\n"
+                 + PROMPT_RULES)
+
+PROMPT_HEAD = """Based on the following git diff, generate a commit message.
+
+Git diff content:
+"""
+
+PROMPT_TAIL = """
+
+Return only the commit message without any additional text or explanations."""
+
+
+
+def json_escape(text):
+    """
+    Encode text as the inside of a JSON string literal (without the quotes)
+    """
+    return _dumps(text)[1:-1]
+
+
+# The static prompt parts, JSON-escaped once at import. Per call only the
+# diff itself has to be escaped and spliced in between them
+PROMPT_HEAD_JSON = json_escape(PROMPT_HEAD)
+PROMPT_TAIL_JSON = json_escape(PROMPT_TAIL)
+
+# Placeholder for the user message content in the request envelope. NUL
+# bytes can't occur in the system prompt, so its serialized form marks
+# exactly where the escaped prompt is spliced in
+PROMPT_PLACEHOLDER = "\0PROMPT\0"
+PROMPT_PLACEHOLDER_JSON = _dumps(PROMPT_PLACEHOLDER)
+
+# Separator the AI is asked to put between messages in a batched request
+BATCH_SEPARATOR = "===MSG==="
+
+# One "<number><unit>" part of a rate limit reset duration like "2m59.56s"
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+# Start of each per-file section in a git diff, capturing the new path
+DIFF_FILE_HEADER = re.compile(r'^diff --git a/.*? b/(.*)$', re.MULTILINE)
+
+# Lockfiles, generated code and binary assets - their content says nothing
+# useful for a commit message, so only a line count is sent
+GENERATED_FILE = re.compile(
+    r'(?:^|/)(?:pubspec\.lock|Podfile\.lock)$'
+    r'|\.(?:g|freezed|mocks|gr|config)\.dart$'
+    r'|\.(?:png|jpe?g|gif|webp|ico|ttf|otf|jar|so)$'
+)
+
+# Line that replaces the content of a generated or binary file section
+GENERATED_SUMMARY_PREFIX = "[generated or binary file changed:"
+
 
 def strip_markdown_code_blocks(text):
     """
@@ -96,128 +248,460 @@ def strip_markdown_code_blocks(text):
     return '\n'.join(lines).strip()
 
 
-def generate_commit_message(git_diff_content):
+# How to react to each non-200 status code: (action, message).
+# "backoff" waits (honoring Retry-After) and retries, "fail" gives up at once.
+# Codes not listed are retried after the normal delay.
+STATUS_ACTIONS = {
+    429: ("backoff", "Rate limit reached"),
+    503: ("backoff", "Service unavailable"),
+    400: ("fail", "Bad Request"),
+    401: ("fail", "API key is invalid or unauthorized"),
+    403: ("fail", "API key doesn't have permission"),
+    404: ("fail", "Model not found - {model}"),
+}
+
+
+def describe_status(response):
     """
-    Generate commit message using selected AI service based on git diff
+    Look up the action and message for a non-200 response
     """
-    # Get current service config
-    config = AI_CONFIGS[DEFAULT_AI_SERVICE]
+    if response.status_code in STATUS_ACTIONS:
+        action, label = STATUS_ACTIONS[response.status_code]
+        return action, label.format(model=current_config.model)
+    # Server-supplied reason is shown verbatim (it may contain braces)
+    return "retry", response.reason or "HTTP Error"
 
-    prompt = f"""Based on the following git diff, generate a commit message following the Angular Conventional Commit format:
 
-<type>(<scope>): <short summary>
-<blank line>
-<body>
-<blank line>
-<footer>
+def is_stale_connection(error):
+    """
+    Check whether a ConnectionError was caused by the server closing an idle
+    pooled connection (RemoteDisconnected / reset / broken pipe)
+    """
+    reason = error.args[0] if error.args else None
+    return any(isinstance(arg, (ConnectionResetError, BrokenPipeError))
+               for arg in getattr(reason, 'args', ()))
 
-Rules:
-- Use one of these types: feat, fix, docs, style, refactor, test, chore
-- (scope) is optional but should describe the module/component (e.g., auth, cart, ui)
-- Summary should be short (max 50 chars) and in imperative form
-- Body (optional) should explain what and why, not how
-- Footer (optional) should include BREAKING CHANGE or issue references if applicable
-- Use proper emoticons where appropriate
-- Don't give any long boring texts, STRICTLY no explanations needed
 
-Git diff content:
-{git_diff_content}
+def post_with_keepalive(url, data, timeout, stream=False, headers=None):
+    """
+    POST through the shared session. If the kept-alive socket turned out to
+    be closed by the server, re-dial once immediately instead of treating it
+    as a failed attempt.
+    """
+    try:
+        return _SESSION.post(url, data=data, timeout=timeout, stream=stream, headers=headers)
+    except requests.exceptions.ConnectionError as e:
+        if not is_stale_connection(e):
+            raise
+        return _SESSION.post(url, data=data, timeout=timeout, stream=stream, headers=headers)
 
-Return only the commit message without any additional text or explanations."""
 
-    payload = {
-        "model": config["model"],
-        "messages": [
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        "max_tokens": 500,
-        "temperature": 0.7
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {config['api_key']}",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
+def read_completion(response):
+    """
+    Read the generated text from a chat completion response.
+    Handles streamed Server-Sent Events (data: {...} chunks with token deltas)
+    and falls back to a regular JSON body if the provider didn't stream.
+
+    Returns:
+        The generated text, or None if the response had no content
+    """
+    if 'text/event-stream' not in response.headers.get('Content-Type', ''):
+        result = _loads(response.content)
+        if 'choices' in result and len(result['choices']) > 0:
+            return result['choices'][0]['message']['content']
+        return None
+
+    pieces = []
+    for line in response.iter_lines():
+        if not line.startswith(b'data:'):
+            continue
+        chunk = line[5:].strip()
+        if chunk == b'[DONE]':
+            break
+        event = _loads(chunk)
+        choices = event.get('choices')
+        if choices:
+            content = choices[0].get('delta', {}).get('content')
+            if content:
+                pieces.append(content)
+
+    return ''.join(pieces) if pieces else None
+
+
+def parse_reset_duration(value):
+    """
+    Parse a rate limit reset duration such as "7.66s", "2m59.56s" or "250ms"
+    into seconds. Returns None if the value can't be parsed.
+    """
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def get_server_retry_hint(response):
+    """
+    Return how many seconds the server asked us to wait, or None.
+    Reads Retry-After (seconds or HTTP-date), then Groq's
+    x-ratelimit-reset-requests / x-ratelimit-reset-tokens headers.
+    """
+    retry_after = response.headers.get('Retry-After', '').strip()
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                return max(0.0, retry_at.timestamp() - time.time())
+            except (TypeError, ValueError, IndexError):
+                pass
+
+    # Only wait for the limit that is actually exhausted - the request quota
+    # can take minutes to refill while the token quota resets in seconds
+    exhausted = [kind for kind in ('requests', 'tokens')
+                 if response.headers.get(f'x-ratelimit-remaining-{kind}', '').strip() == '0']
+    resets = [parse_reset_duration(response.headers.get(f'x-ratelimit-reset-{kind}', ''))
+              for kind in (exhausted or ['tokens'])]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+def get_retry_wait(response, attempt, retry_delay):
+    """
+    Calculate how long to wait before retrying a failed request.
+    Uses exponential backoff, raised to the server's own hint when it asks
+    for longer. Adds up to 25% random jitter so that multiple clients
+    sharing a key don't retry in lockstep.
+    """
+    wait_time = retry_delay * (2 ** attempt)
+    server_hint = get_server_retry_hint(response)
+    if server_hint is not None:
+        wait_time = max(wait_time, server_hint)
+    return wait_time + random.uniform(0, wait_time * 0.25)
+
+
+def split_diff(diff):
+    """
+    Split a git diff into per-file sections.
+
+    Returns:
+        List of (path, section_text) tuples. Any text before the first file
+        header is returned with an empty path.
+    """
+    headers = list(DIFF_FILE_HEADER.finditer(diff))
+    if not headers:
+        return [("", diff)]
+
+    sections = []
+    preamble = diff[:headers[0].start()]
+    if preamble.strip():
+        sections.append(("", preamble))
+
+    for index, header in enumerate(headers):
+        end = headers[index + 1].start() if index + 1 < len(headers) else len(diff)
+        sections.append((header.group(1), diff[header.start():end]))
+    return sections
+
+
+def normalize_diff(diff):
+    """
+    Put diff file sections in a deterministic order (sorted by path) and drop
+    exact duplicate sections. The same set of changes then always produces
+    byte-identical prompts, so both the local cache and the provider's
+    prompt-prefix cache can hit.
+    """
+    sections = split_diff(diff)
+    if len(sections) <= 1:
+        return diff
+
+    seen = set()
+    unique_sections = []
+    for path, text in sections:
+        text = text.rstrip('\n')
+        if text in seen:
+            continue
+        seen.add(text)
+        unique_sections.append((path, text))
+
+    unique_sections.sort(key=lambda section: section[0])
+    return "\n".join(text for _, text in unique_sections)
+
+
+def count_changed_lines(lines):
+    """
+    Count added and removed lines in diff lines, ignoring file headers
+    """
+    added = sum(1 for line in lines if line.startswith('+') and not line.startswith('+++'))
+    removed = sum(1 for line in lines if line.startswith('-') and not line.startswith('---'))
+    return added, removed
+
+
+def condense_section(path, text, collapse_hunks):
+    """
+    Condense one file section of a diff. Generated and binary files are
+    reduced to their header plus a line count. When collapse_hunks is set,
+    hunks longer than DIFF_MAX_HUNK_LINES keep only their @@ header.
+    """
+    lines = text.split('\n')
+    if len(lines) > 1 and lines[1].startswith(GENERATED_SUMMARY_PREFIX):
+        # Already condensed by the caller (e.g. from git diff --numstat)
+        return text
+    if GENERATED_FILE.search(path) or any(line.startswith('Binary files') for line in lines[:6]):
+        added, removed = count_changed_lines(lines)
+        return f"{lines[0]}\n{GENERATED_SUMMARY_PREFIX} +{added} / -{removed} lines]"
+    if not collapse_hunks:
+        return text
+
+    condensed = []
+    hunk = []
+    for line in lines + ['@@']:
+        if line.startswith('@@'):
+            if len(hunk) > DIFF_MAX_HUNK_LINES + 1:
+                added, removed = count_changed_lines(hunk[1:])
+                condensed.extend([hunk[0], f"[+{added} lines / -{removed} lines]"])
+            else:
+                condensed.extend(hunk)
+            hunk = [line]
+        elif hunk:
+            hunk.append(line)
+        else:
+            condensed.append(line)
+    return '\n'.join(condensed)
+
 
+def shrink_diff(diff, max_chars=AI_DIFF_MAX_CHARS):
+    """
+    Keep the diff sent to the AI within max_chars. Generated files are always
+    reduced to a line count; if the diff is still too large, long hunks are
+    collapsed and files that don't fit are listed by name only.
+    """
+    sections = split_diff(diff)
+    condensed = [condense_section(path, text, False) for path, text in sections]
+    if sum(len(text) for text in condensed) <= max_chars:
+        return '\n'.join(condensed)
+
+    kept = []
+    omitted = []
+    used = 0
+    for path, text in sections:
+        text = condense_section(path, text, True)
+        if used + len(text) > max_chars and kept:
+            omitted.append(path)
+            continue
+        kept.append(text)
+        used += len(text)
+
+    if omitted:
+        kept.append(f"[{len(omitted)} more changed files not shown: {', '.join(omitted)}]")
+    return '\n'.join(kept)
+
+
+def commit_cache_path(diff):
+    """
+    Return the cache file path for a diff. The key covers the service, model
+    and prompt so that changing any of them never returns a stale message.
+    """
+    key_source = "\0".join([DEFAULT_AI_SERVICE, current_config.model, SYSTEM_PROMPT, PROMPT_HEAD, PROMPT_TAIL, diff])
+    key = hashlib.sha256(key_source.encode('utf-8', errors='replace')).hexdigest()
+    return COMMIT_CACHE_DIR / key
+
+
+def read_cached_message(diff):
+    """
+    Return the cached commit message for a diff, or None on a miss
+    """
+    if not COMMIT_CACHE_ENABLED:
+        return None
+    path = commit_cache_path(diff)
+    try:
+        message = path.read_text(encoding='utf-8')
+        # Touch the entry so pruning drops the least recently used ones
+        os.utime(path)
+        return message
+    except OSError:
+        return None
+
+
+def write_cached_message(diff, message):
+    """
+    Store a commit message in the cache atomically and keep the cache bounded
+    """
+    if not COMMIT_CACHE_ENABLED or not message:
+        return
+    path = commit_cache_path(diff)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        COMMIT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(message, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+        entries = [entry for entry in os.scandir(COMMIT_CACHE_DIR) if not entry.name.endswith('.tmp')]
+        if len(entries) > COMMIT_CACHE_MAX_ENTRIES:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - COMMIT_CACHE_MAX_ENTRIES]:
+                os.remove(entry.path)
+    except OSError:
+        # The cache is best effort - never fail commit generation over it
+        pass
+
+
+def forget_commit_message(git_diff_content):
+    """
+    Drop the cached commit message for a diff, e.g. after the user rejected
+    it, so the next run generates a new message instead of repeating it
+    """
+    if not COMMIT_CACHE_ENABLED:
+        return
+    try:
+        os.remove(commit_cache_path(shrink_diff(normalize_diff(git_diff_content))))
+    except OSError:
+        pass
+
+
+def build_batch_prompt(diffs):
+    """
+    Build a single prompt asking for one commit message per diff
+    """
+    count = len(diffs)
+    sections = "\n\n".join(
+        f"--- Diff {index} ---\n{diff}" for index, diff in enumerate(diffs, 1)
+    )
+    return (f"Based on the following {count} git diffs, generate {count} commit messages, one per diff and in the same order.\n"
+            + f"Return exactly {count} commit messages separated by a line containing only '{BATCH_SEPARATOR}'.\n\n"
+            + sections
+            + "\n\nReturn only the commit messages and separators without any additional text or explanations.")
+
+
+def load_circuit():
+    """
+    Load the circuit breaker state, or a closed circuit if there is none
+    """
+    try:
+        state = _loads(CIRCUIT_FILE.read_bytes())
+        return {"failures": int(state["failures"]), "open_until": float(state["open_until"])}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {"failures": 0, "open_until": 0.0}
+
+
+def save_circuit(state):
+    """
+    Persist the circuit breaker state (best effort)
+    """
+    try:
+        CIRCUIT_FILE.write_bytes(_dumps(state))
+    except OSError:
+        pass
+
+
+def circuit_open_seconds():
+    """
+    Return how many seconds the circuit stays open, or 0 if requests are allowed
+    """
+    return max(0.0, load_circuit()["open_until"] - time.time())
+
+
+def record_success():
+    """
+    Close the circuit after a successful request
+    """
+    if load_circuit()["failures"]:
+        save_circuit({"failures": 0, "open_until": 0.0})
+
+
+def record_failure():
+    """
+    Count a server-side failure and open the circuit once the threshold is hit
+    """
+    state = load_circuit()
+    state["failures"] += 1
+    if state["failures"] >= CIRCUIT_FAILURE_THRESHOLD:
+        state["open_until"] = time.time() + CIRCUIT_OPEN_SECONDS
+    save_circuit(state)
+
+
+def encode_request(content_json, max_tokens):
+    """
+    Build the JSON request body around an already JSON-escaped prompt.
+    Only the small envelope is serialized here - the prompt bytes are spliced
+    in as-is, so large diffs are never re-encoded.
+    """
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": PROMPT_PLACEHOLDER}]
+    envelope = _dumps(dict(PAYLOAD_BASE, messages=messages, max_tokens=max_tokens, stream=True))
+    head, _, tail = envelope.partition(PROMPT_PLACEHOLDER_JSON)
+    return head + b'"' + content_json + b'"' + tail
+
+
+def request_completion(content_json, max_tokens=500):
+    """
+    Send a prompt to the selected AI service, retrying on transient errors.
+
+    Parameters:
+        content_json: Prompt text, already JSON-escaped (see json_escape)
+        max_tokens: Maximum number of tokens to generate
+
+    Returns:
+        The raw response text, or None if the request failed
+    """
     max_retries = 3
     retry_delay = 2
 
+    # Serialize the payload once - it doesn't change between attempts
+    data = encode_request(content_json, max_tokens)
+    api_url = current_config.api_url
+    # Same key on every attempt, so providers that support idempotency (e.g.
+    # OpenRouter) return the earlier result instead of billing a retry again
+    headers = {"Idempotency-Key": hashlib.sha256(data).hexdigest()}
+    attempt_message = f"{YELLOW}Generating commit message using {SERVICE_LABEL} AI ({current_config.model})..."
+
     for attempt in range(max_retries):
+        open_seconds = circuit_open_seconds()
+        if open_seconds:
+            print(f"{RED}✗ {SERVICE_LABEL} API is failing repeatedly - skipping requests for {open_seconds:.0f} more seconds{NC}")
+            return None
+
         try:
-            # Print context information
-            diff_size = len(git_diff_content)
-            print(f"{BLUE}→ Git diff size: {diff_size} characters{NC}")
-            print(f"{YELLOW}Generating commit message using {DEFAULT_AI_SERVICE.upper()} AI ({config['model']})... (Attempt {attempt + 1}/{max_retries}){NC}")
-
-            # Make request
-            response = requests.post(
-                config["api_url"],
-                json=payload,
-                headers=headers,
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-
-                if 'choices' in result and len(result['choices']) > 0:
-                    raw_message = result['choices'][0]['message']['content'].strip()
-                    # Remove markdown code blocks if AI wrapped the response
-                    commit_message = strip_markdown_code_blocks(raw_message)
-                    print(f"{GREEN}✓ Commit message generated successfully using {DEFAULT_AI_SERVICE.upper()}{NC}")
-                    return commit_message
-                else:
-                    print(f"{RED}Error: No content generated from {DEFAULT_AI_SERVICE.upper()} API{NC}")
-                    if attempt < max_retries - 1:
-                        print(f"{YELLOW}Retrying in {retry_delay} seconds...{NC}")
-                        time.sleep(retry_delay)
-                        continue
-                    return None
-
-            elif response.status_code == 429:
-                if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2 ** attempt)
-                    print(f"{YELLOW}⚠ Rate limit reached (429). Waiting {wait_time} seconds...{NC}")
+            print(f"{attempt_message} (Attempt {attempt + 1}/{max_retries}){NC}")
+
+            # Stream the response so tokens are read as they are generated
+            # instead of waiting for the whole body
+            with post_with_keepalive(api_url, data, timeout=30, stream=True, headers=headers) as response:
+                if response.status_code == 200:
+                    content = read_completion(response)
+
+                    if content:
+                        record_success()
+                        return content.strip()
+                    else:
+                        print(f"{RED}Error: No content generated from {SERVICE_LABEL} API{NC}")
+                        if attempt < max_retries - 1:
+                            print(f"{YELLOW}Retrying in {retry_delay} seconds...{NC}")
+                            time.sleep(retry_delay)
+                            continue
+                        return None
+
+                action, label = describe_status(response)
+                if response.status_code >= 500:
+                    record_failure()
+
+                if action == "backoff" and attempt < max_retries - 1:
+                    wait_time = get_retry_wait(response, attempt, retry_delay)
+                    print(f"{YELLOW}⚠ {label} ({response.status_code}). Waiting {wait_time:.1f} seconds...{NC}")
                     time.sleep(wait_time)
                     continue
-                else:
-                    print(f"{RED}✗ Error 429: Rate limit exceeded.{NC}")
-                    return None
 
-            elif response.status_code == 404:
-                print(f"{RED}✗ Error 404: Model not found - {config['model']}{NC}")
+                print(f"{RED}✗ Error {response.status_code}: {label}{NC}")
                 print(f"{RED}Error details: {response.text}{NC}")
-                return None
-
-            elif response.status_code == 400:
-                print(f"{RED}✗ Bad Request (400): {response.text}{NC}")
-                return None
-
-            elif response.status_code == 401:
-                print(f"{RED}✗ Error 401: API key is invalid or unauthorized{NC}")
-                print(f"{RED}Error details: {response.text}{NC}")
-                return None
-
-            elif response.status_code == 403:
-                print(f"{RED}✗ Error 403: API key doesn't have permission{NC}")
-                print(f"{RED}Error details: {response.text}{NC}")
-                return None
-
-            else:
-                print(f"{RED}✗ HTTP Error {response.status_code}: {response.reason}{NC}")
-                print(f"{RED}Details: {response.text}{NC}")
-                if attempt < max_retries - 1:
-                    print(f"{YELLOW}Retrying in {retry_delay} seconds...{NC}")
-                    time.sleep(retry_delay)
+                if action == "retry" and attempt < max_retries - 1:
+                    wait_time = get_retry_wait(response, attempt, retry_delay)
+                    print(f"{YELLOW}Retrying in {wait_time:.1f} seconds...{NC}")
+                    time.sleep(wait_time)
                     continue
                 return None
 
         except requests.exceptions.Timeout:
             print(f"{RED}Error: Request timed out{NC}")
+            record_failure()
             if attempt < max_retries - 1:
                 print(f"{YELLOW}Retrying in {retry_delay} seconds...{NC}")
                 time.sleep(retry_delay)
@@ -226,6 +710,7 @@ Return only the commit message without any additional text or explanations."""
 
         except requests.exceptions.ConnectionError as e:
             print(f"{RED}Error: Network connection failed - {e}{NC}")
+            record_failure()
             if attempt < max_retries - 1:
                 print(f"{YELLOW}Retrying in {retry_delay} seconds...{NC}")
                 time.sleep(retry_delay)
@@ -249,87 +734,140 @@ Return only the commit message without any additional text or explanations."""
             return None
 
     # All retries exhausted
-    print(f"{RED}✗ {DEFAULT_AI_SERVICE.upper()} API failed after {max_retries} attempts{NC}")
+    print(f"{RED}✗ {SERVICE_LABEL} API failed after {max_retries} attempts{NC}")
     return None
 
+def request_commit_messages(diffs):
+    """
+    Request commit messages for one or more diffs from the AI service,
+    sending them all in a single request.
+
+    Returns:
+        List of commit messages in the same order as diffs, or None on failure
+    """
+    # Print context information
+    diff_size = sum(len(diff) for diff in diffs)
+    if len(diffs) == 1:
+        print(f"{BLUE}→ Git diff size: {diff_size} characters{NC}")
+        content_json = PROMPT_HEAD_JSON + json_escape(diffs[0]) + PROMPT_TAIL_JSON
+    else:
+        print(f"{BLUE}→ Git diff size: {diff_size} characters across {len(diffs)} diffs{NC}")
+        content_json = json_escape(build_batch_prompt(diffs))
+
+    raw_response = request_completion(content_json, max_tokens=500 * len(diffs))
+    if raw_response is None:
+        return None
+
+    if len(diffs) == 1:
+        # Remove markdown code blocks if AI wrapped the response
+        messages = [strip_markdown_code_blocks(raw_response)]
+    else:
+        parts = strip_markdown_code_blocks(raw_response).split(BATCH_SEPARATOR)
+        messages = [strip_markdown_code_blocks(part) for part in parts]
+        messages = [message for message in messages if message]
+
+        if len(messages) != len(diffs):
+            print(f"{RED}✗ Expected {len(diffs)} commit messages but got {len(messages)}{NC}")
+            return None
+
+    print(f"{GREEN}✓ Commit message generated successfully using {SERVICE_LABEL}{NC}")
+    return messages
+
+
+def generate_commit_messages(diffs):
+    """
+    Generate commit messages for several git diffs using a single AI request.
+    Saves one full round trip per extra diff when processing a series of commits.
+    Diffs that already have a cached message are not sent at all.
+
+    Parameters:
+        diffs: List of git diff strings
+
+    Returns:
+        List of commit messages in the same order as diffs, or None on failure
+    """
+    if not diffs:
+        return []
+
+    diffs = [shrink_diff(normalize_diff(diff)) for diff in diffs]
+    messages = [read_cached_message(diff) for diff in diffs]
+    missing = [index for index, message in enumerate(messages) if message is None]
+
+    if not missing:
+        print(f"{GREEN}✓ Using cached commit message for unchanged diff{NC}")
+        return messages
+
+    generated = request_commit_messages([diffs[index] for index in missing])
+    if generated is None:
+        return None
+
+    for index, message in zip(missing, generated):
+        messages[index] = message
+        write_cached_message(diffs[index], message)
+    return messages
+
+
+def generate_commit_messages_batch(diffs):
+    """
+    Generate commit messages for many diffs. Diffs are grouped AI_BATCH_SIZE
+    per request and up to AI_MAX_CONCURRENCY requests run at the same time,
+    so total wall time is close to a single request instead of N of them.
+
+    Returns:
+        List of commit messages in the same order as diffs. Entries are None
+        for diffs whose request failed.
+    """
+    groups = [diffs[i:i + AI_BATCH_SIZE] for i in range(0, len(diffs), AI_BATCH_SIZE)]
+    if not groups:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(AI_MAX_CONCURRENCY, len(groups))) as executor:
+        results = list(executor.map(generate_commit_messages, groups))
+
+    messages = []
+    for group, result in zip(groups, results):
+        messages.extend(result if result else [None] * len(group))
+    return messages
+
+
+def generate_commit_message(git_diff_content):
+    """
+    Generate commit message using selected AI service based on git diff
+    """
+    messages = generate_commit_messages([git_diff_content])
+    return messages[0] if messages else None
+
 def test_api_connection():
     """
     Test selected AI service API connection
     """
-    # Get current service config
-    config = AI_CONFIGS[DEFAULT_AI_SERVICE]
-
     test_prompt = "Hello, respond with 'API connection successful'"
 
-    payload = {
-        "model": config["model"],
-        "messages": [
-            {
-                "role": "user",
-                "content": test_prompt
-            }
-        ],
-        "max_tokens": 50,
-        "temperature": 0.7
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {config['api_key']}",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
+    payload = dict(PAYLOAD_BASE, messages=[{"role": "user", "content": test_prompt}], max_tokens=50)
 
     try:
-        print(f"{BLUE}Testing {DEFAULT_AI_SERVICE.upper()} API connection with {config['model']}...{NC}")
+        print(f"{BLUE}Testing {SERVICE_LABEL} API connection with {current_config.model}...{NC}")
 
         # Make request
-        response = requests.post(
-            config["api_url"],
-            json=payload,
-            headers=headers,
-            timeout=10
-        )
+        response = post_with_keepalive(current_config.api_url, _dumps(payload), timeout=10)
 
         if response.status_code == 200:
-            result = response.json()
-            print(f"{GREEN}✓ {DEFAULT_AI_SERVICE.upper()} API connection successful{NC}")
+            text = read_completion(response)
+            print(f"{GREEN}✓ {SERVICE_LABEL} API connection successful{NC}")
 
             # Print response for debugging
-            if 'choices' in result and len(result['choices']) > 0:
-                text = result['choices'][0]['message']['content']
+            if text:
                 print(f"{BLUE}API Response: {text}{NC}")
 
             return True
 
-        elif response.status_code == 429:
-            print(f"{RED}✗ HTTP Error 429: Rate limit reached{NC}")
+        action, label = describe_status(response)
+        print(f"{RED}✗ HTTP Error {response.status_code}: {label}{NC}")
+        if action == "backoff":
             print(f"{YELLOW}⚠ Wait a few minutes and try again.{NC}")
-            return False
-
-        elif response.status_code == 404:
-            print(f"{RED}✗ HTTP Error 404: Model not found - {config['model']}{NC}")
-            print(f"{RED}Error details: {response.text}{NC}")
-            return False
-
-        elif response.status_code == 400:
-            print(f"{RED}✗ HTTP Error 400: Bad Request{NC}")
-            print(f"{RED}Error details: {response.text}{NC}")
-            return False
-
-        elif response.status_code == 401:
-            print(f"{RED}✗ HTTP Error 401: API key is invalid or unauthorized{NC}")
-            print(f"{RED}Error details: {response.text}{NC}")
-            return False
-
-        elif response.status_code == 403:
-            print(f"{RED}✗ HTTP Error 403: API key doesn't have permission{NC}")
-            print(f"{RED}Error details: {response.text}{NC}")
-            return False
-
         else:
-            print(f"{RED}✗ {DEFAULT_AI_SERVICE.upper()} API connection failed with status {response.status_code}{NC}")
-            print(f"{RED}Response: {response.text}{NC}")
-            return False
+            print(f"{RED}Error details: {response.text}{NC}")
+        return False
 
     except requests.exceptions.Timeout:
         print(f"{RED}✗ Request timed out{NC}")
@@ -340,12 +878,30 @@ def test_api_connection():
         return False
 
     except Exception as e:
-        print(f"{RED}✗ {DEFAULT_AI_SERVICE.upper()} API connection failed: {e}{NC}")
+        print(f"{RED}✗ {SERVICE_LABEL} API connection failed: {e}{NC}")
         return False
 
+def warm_up_connection():
+    """
+    Open the TLS connection to the AI host ahead of the first request.
+    Purely a warm-up, so any error is ignored.
+    """
+    parts = urlsplit(current_config.api_url)
+    if not parts.scheme or not parts.netloc:
+        return
+    try:
+        _SESSION.head(f"{parts.scheme}://{parts.netloc}/", timeout=5)
+    except Exception:
+        pass
+
+
+# Start the DNS/TCP/TLS handshake in the background at import, so it overlaps
+# with reading the diff instead of delaying the first commit message request
+threading.Thread(target=warm_up_connection, daemon=True).start()
+
 if __name__ == "__main__":
     # Test the API connection
     print(f"{BLUE}{'='*50}{NC}")
-    print(f"{BLUE}{DEFAULT_AI_SERVICE.upper()} API Connection Test{NC}")
+    print(f"{BLUE}{SERVICE_LABEL} API Connection Test{NC}")
     print(f"{BLUE}{'='*50}{NC}")
     test_api_connection()
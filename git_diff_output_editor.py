@@ -1,30 +1,107 @@
 #!/usr/bin/env python3
+"""
+Git Diff Output Editor
+Writes the current git diff plus a commit message prompt to diff_output.txt
+and opens it in the default editor, or copies it straight to the clipboard.
+Usage: python3 git_diff_output_editor.py [--clipboard]
+"""
 
 import subprocess
+import shutil
+import sys
 import os
 
 # Import common utilities
-from common_utils import open_file_with_default_app, BLUE, NC
+from common_utils import (
+    open_file_with_default_app, PLATFORM_SYSTEM, BLUE, GREEN, YELLOW, NC
+)
 
-# Use current working directory instead of hardcoded path
-folder_path = os.getcwd()
+# Output file, created in the current working directory
+DIFF_OUTPUT_FILE = 'diff_output.txt'
 
-print(f"{BLUE}Working in directory: {folder_path}{NC}")
+# git diff without pager, colours or external diff drivers (no extra child
+# processes, plain bytes only)
+GIT_DIFF_COMMAND = ['git', '--no-pager', 'diff', '--no-color', '--no-ext-diff']
 
-# Change the working directory to the specified folder (already current directory)
-os.chdir(folder_path)
+# Warn when the diff is larger than this many bytes (generated/vendored files)
+DIFF_SIZE_WARNING = 1 << 20
 
-# Execute the git diff command and write output to diff_output.txt
-with open('diff_output.txt', 'w') as file:
-    subprocess.run(['git', 'diff'], stdout=file)
+# Clipboard commands per platform, tried in order (Linux: Wayland then X11)
+CLIPBOARD_COMMANDS = {
+    "Darwin": [['pbcopy']],
+    "Windows": [['clip']],
+    "Linux": [['wl-copy'], ['xclip', '-selection', 'clipboard'],
+              ['xsel', '--clipboard', '--input']],
+}
 
 # Text to append
-text_to_append = '\n================\n\nhere is my changes...give me git push msg and description of changes with using of proper emoticons...dont give any long boring texts, "STRICTLY i dont need any explanations"\n'
+TEXT_TO_APPEND = '\n================\n\nhere is my changes...give me git push msg and description of changes with using of proper emoticons...dont give any long boring texts, "STRICTLY i dont need any explanations"\n'
 
-# Append the specified text to diff_output.txt
-with open('diff_output.txt', 'a') as file:
-    file.write(text_to_append)
 
-# Open the file with default editor
-open_file_with_default_app('diff_output.txt')
+def write_diff_output(output_file=DIFF_OUTPUT_FILE):
+    """
+    Write the git diff output and the prompt text to output_file with a
+    single open. git writes straight into the file descriptor, then the text
+    is appended at the end in binary mode (no re-encoding of the diff)
+    """
+    with open(output_file, 'wb') as file:
+        subprocess.run(GIT_DIFF_COMMAND, stdout=file)
+        diff_size = file.seek(0, os.SEEK_END)
+        if diff_size > DIFF_SIZE_WARNING:
+            print(f"{YELLOW}Diff is {diff_size // 1024} KB - check for generated "
+                  f"or vendored files before pasting it{NC}")
+        file.write(TEXT_TO_APPEND.encode('utf-8'))
 
+
+def get_clipboard_command():
+    """
+    Return the clipboard command for this platform, or None if none is installed
+    """
+    for command in CLIPBOARD_COMMANDS.get(PLATFORM_SYSTEM, []):
+        if shutil.which(command[0]):
+            return command
+    return None
+
+
+def copy_diff_to_clipboard(clip_command):
+    """
+    Pipe the git diff output and the prompt text straight into the clipboard
+    command, without writing a file or launching an editor
+    Returns:
+        True if the clipboard command succeeded, False otherwise
+    """
+    clip = subprocess.Popen(clip_command, stdin=subprocess.PIPE)
+    diff = subprocess.Popen(GIT_DIFF_COMMAND, stdout=subprocess.PIPE)
+    try:
+        shutil.copyfileobj(diff.stdout, clip.stdin, 1 << 20)
+        clip.stdin.write(TEXT_TO_APPEND.encode('utf-8'))
+    finally:
+        diff.stdout.close()
+        clip.stdin.close()
+    diff.wait()
+    return clip.wait() == 0
+
+
+def main():
+    """
+    Main function to write the diff file and open it in the default editor,
+    or copy it to the clipboard with --clipboard
+    """
+    # Use current working directory instead of hardcoded path
+    print(f"{BLUE}Working in directory: {os.getcwd()}{NC}")
+
+    if '--clipboard' in sys.argv[1:]:
+        clip_command = get_clipboard_command()
+        if clip_command and copy_diff_to_clipboard(clip_command):
+            print(f"{GREEN}Diff copied to clipboard{NC}")
+            return
+        print(f"{YELLOW}Clipboard not available, writing {DIFF_OUTPUT_FILE} instead{NC}")
+
+    write_diff_output()
+
+    # Open the file with default editor
+    open_file_with_default_app(DIFF_OUTPUT_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ from pathlib import Path
 from common_utils import (
     RED, GREEN, YELLOW, BLUE, NC, MAGENTA,
     read_env_value,
-    update_env_value,
+    update_env_values,
     is_windows,
 )
 
@@ -75,7 +75,7 @@ def show_ai_status():
 
 def do_switch(current, service, env_file):
     """Perform the actual switch"""
-    if update_env_value("DEFAULT_AI_SERVICE", service, env_file):
+    if update_env_values({"DEFAULT_AI_SERVICE": service}, env_file):
         print(f"\n{GREEN}  Switched: {BLUE}{current or 'none'}{NC} → {GREEN}{service}{NC}")
     else:
         print(f"\n{RED}  Failed to switch{NC}")
@@ -102,7 +102,7 @@ def switch_ai_service(service):
         print(f"{YELLOW}Already using: {GREEN}{service}{NC}")
         return
 
-    if update_env_value("DEFAULT_AI_SERVICE", service, env_file):
+    if update_env_values({"DEFAULT_AI_SERVICE": service}, env_file):
         print(f"{GREEN}Switched: {BLUE}{current or 'none'}{NC} → {GREEN}{service}{NC}")
     else:
         print(f"{RED}Failed to switch{NC}")
@@ -3,7 +3,12 @@
 App Manager - Install, uninstall, clear data functions
 """
 
+import shlex
+import shutil
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from common_utils import RED, GREEN, YELLOW, BLUE, NC
 from core.constants import PATTERNS, PATHS
@@ -11,6 +16,7 @@ from managers.device import (
     get_all_connected_devices,
     ensure_device_connected,
     build_adb_cmd,
+    run_adb_shell,
 )
 from managers.build import run_flutter_command, get_package_name
 
@@ -34,14 +40,7 @@ def is_app_installed(package_name):
     """
     try:
         # Primary check: adb shell pm path (detects packages with APK on disk)
-        result = subprocess.run(
-            build_adb_cmd(["shell", "pm", "path", package_name]),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            timeout=5
-        )
+        result = run_adb_shell(f"pm path {shlex.quote(package_name)}")
         # If app is installed, output will be like: "package:/data/app/..."
         # If not installed, output will be empty or error
         if result.returncode == 0 and result.stdout.strip().startswith("package:"):
@@ -49,14 +48,7 @@ def is_app_installed(package_name):
 
         # Fallback: pm list packages (detects ghost packages where APK is missing
         # but package entry still exists in the system database)
-        result = subprocess.run(
-            build_adb_cmd(["shell", "pm", "list", "packages", package_name]),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            timeout=5
-        )
+        result = run_adb_shell(f"pm list packages {shlex.quote(package_name)}")
         if result.returncode == 0 and f"package:{package_name}" in result.stdout:
             return True
 
@@ -65,31 +57,61 @@ def is_app_installed(package_name):
         return False
 
 
-def get_current_foreground_app():
+# xcrun is only available on macOS with Xcode installed
+_HAS_XCRUN = shutil.which("xcrun") is not None
+
+
+@lru_cache(maxsize=1)
+def _is_ios_simulator_booted():
     """
-    Get the package name of currently running foreground app
-    Returns: (platform, package_name) tuple or (None, None) if failed
+    Check if an iOS simulator is booted.
+    Skips the check entirely when xcrun isn't available (no Xcode / not macOS).
+    Cached, so uninstall falling back to foreground app detection doesn't
+    run the xcrun probe a second time.
     """
-    # Check for iOS simulator first
+    if not _HAS_XCRUN:
+        return False
+
     try:
+        # Only an ASCII marker is checked, so keep the output as bytes
         ios_check = subprocess.run(
             ["xcrun", "simctl", "list", "devices", "booted"],
             capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
             timeout=5
         )
-        ios_connected = ios_check.returncode == 0 and "Booted" in ios_check.stdout
+        return ios_check.returncode == 0 and b"Booted" in ios_check.stdout
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return False
+
 
+def _detect_connected_platforms():
+    """
+    Probe for a booted iOS simulator and connected Android devices in parallel,
+    so the wait is the slower of the two checks instead of their sum.
+    Returns: (ios_connected, android_devices) tuple
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ios_future = executor.submit(_is_ios_simulator_booted)
+        android_future = executor.submit(get_all_connected_devices)
+        return ios_future.result(), android_future.result()
+
+
+def get_current_foreground_app():
+    """
+    Get the package name of currently running foreground app
+    Returns: (platform, package_name) tuple or (None, None) if failed
+    """
+    ios_connected, devices = _detect_connected_platforms()
+
+    # Check for iOS simulator first
+    try:
         if ios_connected:
             # Get foreground app on iOS simulator
+            # Only the exit code is used, so discard the (long) service list
             result = subprocess.run(
                 ["xcrun", "simctl", "spawn", "booted", "launchctl", "list"],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=5
             )
 
@@ -126,7 +148,6 @@ def get_current_foreground_app():
 
     # Check for Android device
     try:
-        devices = get_all_connected_devices()
         android_connected = len(devices) > 0
 
         if android_connected:
@@ -134,49 +155,24 @@ def get_current_foreground_app():
             if not ensure_device_connected():
                 return (None, None)
 
-            # Get current foreground app on Android
-            result = subprocess.run(
-                build_adb_cmd(["shell", "dumpsys", "window", "windows"]),
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                timeout=5
-            )
+            # Get current foreground app on Android. grep runs on the device,
+            # so only the few focus lines come back instead of the full dump
+            result = run_adb_shell("dumpsys window windows | grep -E 'mCurrentFocus|mFocusedApp|mFocusedWindow'")
 
-            if result.returncode == 0:
-                # Parse output to find current focused app
-                for line in result.stdout.split('\n'):
-                    if 'mCurrentFocus' in line or 'mFocusedApp' in line or 'mFocusedWindow' in line:
-                        # Extract package name using regex
-                        match = PATTERNS['foreground_app'].search(line)
-                        if match:
-                            package_name = match.group(1)
-                            return ("android", package_name)
-
-                # Fallback: Try using dumpsys activity
-                result2 = subprocess.run(
-                    build_adb_cmd(["shell", "dumpsys", "activity", "activities"]),
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
-                    timeout=5
-                )
-
-                if result2.returncode == 0:
-                    # Try multiple patterns for different Android versions
-                    # Pattern 1: mResumedActivity (older Android)
-                    match = PATTERNS['resumed_activity'].search(result2.stdout)
-                    if match:
-                        package_name = match.group(1)
-                        return ("android", package_name)
-
-                    # Pattern 2: topResumedActivity or ResumedActivity (newer Android)
-                    match = PATTERNS['top_resumed_activity'].search(result2.stdout)
-                    if match:
-                        package_name = match.group(1)
-                        return ("android", package_name)
+            # grep exits with 1 when nothing matched, so check the output itself
+            match = PATTERNS['foreground_app'].search(result.stdout)
+            if match:
+                package_name = match.group(1)
+                return ("android", package_name)
+
+            # Fallback: Try using dumpsys activity (also filtered on the device).
+            # One pattern covers the resumed activity line of all Android versions
+            result2 = run_adb_shell("dumpsys activity activities | grep ResumedActivity")
+
+            match = PATTERNS['resumed_activity'].search(result2.stdout)
+            if match:
+                package_name = match.group(1)
+                return ("android", package_name)
 
     except (FileNotFoundError, subprocess.TimeoutExpired):
         pass
@@ -184,6 +180,20 @@ def get_current_foreground_app():
     return (None, None)
 
 
+def _confirm(panel, prompt):
+    """
+    Show an info panel and a Y/n prompt with a single write, then read the answer
+    Parameters:
+        panel: List of lines (with newlines) shown above the prompt
+        prompt: Confirmation question
+    Returns:
+        False if the user answered 'n', True otherwise
+    """
+    sys.stdout.write("".join(panel) + prompt)
+    sys.stdout.flush()
+    return input().lower() != 'n'
+
+
 def clear_app_data():
     """
     Automatically clear data of currently running foreground app
@@ -204,12 +214,11 @@ def clear_app_data():
         print(f"{YELLOW}Make sure an app is running in the foreground{NC}")
         return False
 
-    print(f"{BLUE}Platform: {platform_type.upper()}{NC}")
-    print(f"{BLUE}App: {package_name}{NC}\n")
-
     # Ask for confirmation
-    user_input = input(f"Clear data for {GREEN}{package_name}{NC}? (Y/n): ")
-    if user_input.lower() == 'n':
+    if not _confirm([
+        f"{BLUE}Platform: {platform_type.upper()}{NC}\n",
+        f"{BLUE}App: {package_name}{NC}\n\n",
+    ], f"Clear data for {GREEN}{package_name}{NC}? (Y/n): "):
         print(f"{YELLOW}Operation cancelled{NC}")
         return False
 
@@ -249,26 +258,31 @@ def clear_app_data():
     return False
 
 
+@lru_cache(maxsize=1)
+def _bundle_id_from_plist():
+    """
+    Read CFBundleIdentifier from the project's Info.plist using PlistBuddy.
+    Cached so PlistBuddy runs at most once per command.
+    Raises subprocess.CalledProcessError if PlistBuddy fails.
+    """
+    result = subprocess.run(
+        ["/usr/libexec/PlistBuddy", "-c", "Print CFBundleIdentifier", str(PATHS['info_plist'])],
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        check=True
+    )
+    return result.stdout.strip()
+
+
 def _uninstall_from_project_root():
     """
     Uninstall app using project files (build.gradle / Info.plist).
     Called when running from Flutter project root directory.
     """
     # Check which device is connected
-    try:
-        ios_check = subprocess.run(
-            ["xcrun", "simctl", "list", "devices", "booted"],
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            timeout=5
-        )
-        ios_connected = ios_check.returncode == 0 and "Booted" in ios_check.stdout
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        ios_connected = False
-
-    devices = get_all_connected_devices()
+    ios_connected, devices = _detect_connected_platforms()
     android_connected = len(devices) > 0
 
     # Handle iOS Simulator
@@ -281,15 +295,7 @@ def _uninstall_from_project_root():
             return False
 
         try:
-            result = subprocess.run(
-                ["/usr/libexec/PlistBuddy", "-c", "Print CFBundleIdentifier", str(info_plist_path)],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                check=True
-            )
-            bundle_id = result.stdout.strip()
+            bundle_id = _bundle_id_from_plist()
 
             if not bundle_id or bundle_id.startswith("$("):
                 bundle_id = get_package_name()
@@ -368,12 +374,11 @@ def _uninstall_from_project_root():
                 print(f"{YELLOW}Make sure an app is running in the foreground{NC}")
                 return False
 
-            print(f"{BLUE}Foreground App: {foreground_package}{NC}\n")
-
             # Ask for confirmation before uninstalling foreground app
-            print(f"{RED}⚠️  WARNING: This will UNINSTALL the foreground app!{NC}")
-            user_input = input(f"Uninstall {GREEN}{foreground_package}{NC}? (Y/n): ")
-            if user_input.lower() == 'n':
+            if not _confirm([
+                f"{BLUE}Foreground App: {foreground_package}{NC}\n\n",
+                f"{RED}⚠️  WARNING: This will UNINSTALL the foreground app!{NC}\n",
+            ], f"Uninstall {GREEN}{foreground_package}{NC}? (Y/n): "):
                 print(f"{YELLOW}Operation cancelled{NC}")
                 return False
 
@@ -416,17 +421,13 @@ def _uninstall_foreground_app():
         print(f"{YELLOW}Make sure an app is running in the foreground{NC}")
         return False
 
-    # Show app info with warning
-    print(f"{BLUE}Platform: {platform_type.upper()}{NC}")
-    print(f"{BLUE}Detected App: {package_name}{NC}\n")
-
-    # Extra warning for foreground app uninstall
-    print(f"{RED}⚠️  WARNING: This will UNINSTALL the app completely!{NC}")
-    print(f"{RED}   All app data will be permanently deleted.{NC}\n")
-
-    # Simple Y/n confirmation
-    user_input = input(f"Uninstall {GREEN}{package_name}{NC}? (Y/n): ")
-    if user_input.lower() == 'n':
+    # Show app info with an extra warning, then a simple Y/n confirmation
+    if not _confirm([
+        f"{BLUE}Platform: {platform_type.upper()}{NC}\n",
+        f"{BLUE}Detected App: {package_name}{NC}\n\n",
+        f"{RED}⚠️  WARNING: This will UNINSTALL the app completely!{NC}\n",
+        f"{RED}   All app data will be permanently deleted.{NC}\n\n",
+    ], f"Uninstall {GREEN}{package_name}{NC}? (Y/n): "):
         print(f"{YELLOW}Operation cancelled{NC}")
         return False
 
@@ -486,29 +487,39 @@ def install_apk():
     if not ensure_device_connected():
         return False
 
-    apk_dir = PATHS['apk_output']
-    apk_files = [str(f) for f in apk_dir.glob("*.apk")] if apk_dir.exists() else []
-    if not apk_files:
-        print(f"{RED}No APK found to install!{NC}")
-        return False
-
-    # Try to install arm64-v8a APK first, otherwise use the first apk
+    # Try to install arm64-v8a APK first, otherwise use the first apk.
+    # Single pass over the output directory, stopping at the arm64-v8a APK
     target_apk = None
-    for apk_path in apk_files:
-        if "arm64-v8a" in apk_path:
-            target_apk = apk_path
-            break
+    first_apk = None
+    try:
+        for apk_path in PATHS['apk_output'].iterdir():
+            if apk_path.suffix != ".apk":
+                continue
+            if "arm64-v8a" in apk_path.name:
+                target_apk = str(apk_path)
+                break
+            if first_apk is None:
+                first_apk = str(apk_path)
+    except FileNotFoundError:
+        pass
+
+    target_apk = target_apk or first_apk
     if not target_apk:
-        target_apk = apk_files[0]
+        print(f"{RED}No APK found to install!{NC}")
+        return False
 
     print(f"{YELLOW}Installing {target_apk}...{NC}")
 
-    # First try normal install
-    success = run_flutter_command(build_adb_cmd(["install", "-r", target_apk]), "Installing on device...                              ")
+    # Read the package name from the gradle files while the APK uploads -
+    # it is needed afterwards either to launch the app or to reinstall
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        package_future = executor.submit(get_package_name)
+
+        # First try normal install
+        success = run_flutter_command(build_adb_cmd(["install", "-r", target_apk]), "Installing on device...                              ")
+        package_name = package_future.result()
 
     if not success:
-        # Get package name dynamically
-        package_name = get_package_name()
         if not package_name:
             print(f"{RED}Cannot proceed without package name{NC}")
             return False
@@ -523,7 +534,6 @@ def install_apk():
 
     # Launch app after successful installation
     if success:
-        package_name = get_package_name()
         if package_name:
             print(f"{YELLOW}Launching app...{NC}")
             # Launch the app using monkey command (works on all devices)
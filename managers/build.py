@@ -3,99 +3,242 @@
 Build Manager - APK/AAB build functions
 """
 
-import time
+import os
+import json
+import mmap
 import shutil
+import hashlib
+import tempfile
 import subprocess
 from pathlib import Path
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 
 from common_utils import (
-    RED, GREEN, YELLOW, BLUE, NC, MAGENTA, CHECKMARK, CROSS,
+    RED, GREEN, YELLOW, BLUE, NC, CHECKMARK, CROSS,
     timer_decorator,
+    spin_until,
+    wait_with_spinner,
     is_windows,
     open_directory,
 )
-from core.constants import PATTERNS, PATHS
+from core.constants import PATTERNS, PATHS, BUILD_COMMANDS
+
+# Compiled patterns used on every build, bound once at import
+_PKG_KTS = PATTERNS['package_name_kts']
+_PKG_GROOVY = PATTERNS['package_name_groovy']
+_APP_LABEL = PATTERNS['app_label']
+_ARCH = PATTERNS['architecture']
+_SANITIZE_NON_WORD = PATTERNS['sanitize_non_word']
+_SANITIZE_SPACES = PATTERNS['sanitize_spaces']
+
+# Bytes of output shown when a build step fails (the full log is kept on disk)
+BUILD_LOG_TAIL_BYTES = 8192
+
+# Spinner text for each build step, padded once so the spinners line up
+DESCRIPTION_WIDTH = 53
+STEP_DESCRIPTIONS = {key: text.ljust(DESCRIPTION_WIDTH) for key, text in {
+    'clean': "Cleaning project...",
+    'pub_get': "Getting dependencies...",
+    'l10n': "Generating localizations...",
+    'build_runner': "Generating build files...",
+    'codegen': "Generating localizations and build files...",
+    'pod_deintegrate': "Deintegrating pods...",
+    'pod_install': "Installing pods...",
+    'apk': "Building APK...",
+    'apk_split': "Building APK (split-per-abi)...",
+    'aab': "Building AAB...",
+    'ipa': "Building IPA...",
+}.items()}
+
+
+def start_flutter_command(cmd_list, log_file):
+    """
+    Starts a flutter/dart command with stdout and stderr going straight to
+    log_file (no pipes, nothing buffered in memory).
+    Returns the Popen object.
+    """
+    # Windows compatibility for shell commands
+    shell_needed = (is_windows() and cmd_list[0] in ['timeout', 'start', 'flutter', 'dart']) or cmd_list[0] == 'pod'
+
+    return subprocess.Popen(
+        cmd_list,
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+        shell=shell_needed
+    )
 
 
-def show_loading(description, process):
+def report_failed_command(description, log_file, append=False, save_log=False):
     """
-    Displays a loading spinner with a custom message while a process is running
+    Print the tail of a failed command's output and, for build steps, keep
+    its full output in build/last_build.log
     Parameters:
-        description: Description message to display
-        process: Process object to monitor
+        description: Spinner text of the failed step
+        log_file: Binary file object holding the command output
+        append: Add to the saved log instead of replacing it
+        save_log: Save the full output to build/last_build.log
     """
-    spinner_index = 0
-    braille_spinner_list = '⡿⣟⣯⣷⣾⣽⣻⢿'
-    print(description, end='', flush=True)
-    # Continue spinning while the process is running
-    while process.poll() is None:
-        print(f"\b{MAGENTA}{braille_spinner_list[spinner_index]}{NC}", end='', flush=True)
-        spinner_index = (spinner_index + 1) % len(braille_spinner_list)
-        time.sleep(0.025)
-    stdout, stderr = process.communicate()
-    # Display success or failure icon based on the process exit status
-    if process.returncode == 0:
-        print(f"\b{CHECKMARK} ", flush=True)
-        return True
-    else:
-        print(f"\b{CROSS} ", flush=True)
-        if stdout:
-            print(f"\n{GREEN}Output:\n{stdout}{NC}")
-        if stderr:
-            print(f"\n{RED}Error Output:\n{stderr}{NC}")
-        return False
+    size = log_file.seek(0, os.SEEK_END)
+    log_file.seek(max(0, size - BUILD_LOG_TAIL_BYTES))
+    tail = log_file.read().decode('utf-8', 'replace')
+    print(f"\n{RED}Failed: {description.strip()}{NC}")
+    if tail:
+        print(f"\n{RED}Output{' (last lines)' if size > BUILD_LOG_TAIL_BYTES else ''}:\n{tail}{NC}")
+
+    # Only Flutter build steps write into the project's build/ directory;
+    # other commands (git, adb, ...) may run outside a Flutter project
+    if not save_log:
+        return
+
+    log_path = PATHS['build_log']
+    try:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_file.seek(0)
+        with open(log_path, 'ab' if append else 'wb') as saved:
+            shutil.copyfileobj(log_file, saved)
+        print(f"{YELLOW}Full log: {log_path}{NC}")
+    except OSError:
+        pass
 
 
-def run_flutter_command(cmd_list, description):
+def run_flutter_command(cmd_list, description, save_log=False):
     """
     Runs a flutter/dart command with a loading spinner.
+    Output goes to a temporary file; on failure its tail is shown and, with
+    save_log, the full output is kept in build/last_build.log.
     Parameters:
         cmd_list: List of command arguments
         description: Description to show with spinner
+        save_log: Keep the output of a failed build step in build/last_build.log
     """
-    # Windows compatibility for shell commands
-    shell_needed = (is_windows() and cmd_list[0] in ['timeout', 'start', 'flutter', 'dart']) or cmd_list[0] == 'pod'
+    with tempfile.TemporaryFile() as log_file:
+        process = start_flutter_command(cmd_list, log_file)
+        print(description, end='', flush=True)
+        wait_with_spinner(process)
+        # Display success or failure icon based on the process exit status
+        if process.wait() == 0:
+            print(f"\b{CHECKMARK} ", flush=True)
+            return True
+        print(f"\b{CROSS} ", flush=True)
+        report_failed_command(description, log_file, save_log=save_log)
+        return False
 
-    process = subprocess.Popen(
-        cmd_list,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        shell=shell_needed,
-        encoding='utf-8',
-        errors='replace'
-    )
-    return show_loading(description, process)
+
+def run_flutter_commands_parallel(commands, description, save_log=False):
+    """
+    Runs independent flutter/dart commands at the same time behind one spinner.
+    Set FDEV_SEQUENTIAL=1 to run them one by one instead (easier to debug).
+    Parameters:
+        commands: List of (cmd_list, description) tuples
+        description: Description to show with spinner while they all run
+        save_log: Keep the output of failed build steps in build/last_build.log
+    Returns:
+        True if every command succeeded, False otherwise
+    """
+    if os.environ.get('FDEV_SEQUENTIAL'):
+        results = [run_flutter_command(cmd_list, desc, save_log) for cmd_list, desc in commands]
+        return all(results)
+
+    print(description, end='', flush=True)
+    log_files = [tempfile.TemporaryFile() for _ in commands]
+    try:
+        processes = [
+            start_flutter_command(cmd_list, log_file)
+            for (cmd_list, _), log_file in zip(commands, log_files)
+        ]
+        with ThreadPoolExecutor(max_workers=len(processes)) as executor:
+            futures = [executor.submit(process.wait) for process in processes]
+            spin_until(lambda timeout: not wait_futures(futures, timeout).not_done)
+
+        failed = [
+            (desc, log_file)
+            for (_, desc), process, log_file in zip(commands, processes, log_files)
+            if process.returncode != 0
+        ]
+        if not failed:
+            print(f"\b{CHECKMARK} ", flush=True)
+            return True
+
+        print(f"\b{CROSS} ", flush=True)
+        for index, (desc, log_file) in enumerate(failed):
+            report_failed_command(desc, log_file, append=index > 0, save_log=save_log)
+        return False
+    finally:
+        for log_file in log_files:
+            log_file.close()
+
+
+# Code generation steps that only need `pub get` and don't depend on each other
+CODEGEN_COMMANDS = [
+    (["flutter", "gen-l10n"], STEP_DESCRIPTIONS['l10n']),
+    (["dart", "run", "build_runner", "build", "--delete-conflicting-outputs"], STEP_DESCRIPTIONS['build_runner']),
+]
+
+
+def _file_cache_key(path):
+    """
+    Memoization key for a value read from path: (path, mtime) or None if the
+    file doesn't exist. Editing the file changes the key, so cached values
+    never go stale.
+    """
+    try:
+        return (path, path.stat().st_mtime_ns)
+    except OSError:
+        return None
+
+
+def _search_file(path, pattern):
+    """
+    Search a file with a bytes pattern and return group 1 decoded, or None.
+    The file is memory-mapped so the regex scans it in place and stops at the
+    first match; empty files (which can't be mapped) fall back to a plain read.
+    """
+    with open(path, 'rb') as file:
+        try:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                match = pattern.search(content)
+                return match.group(1).decode('utf-8', 'replace') if match else None
+        except (ValueError, OSError):
+            match = pattern.search(file.read())
+            return match.group(1).decode('utf-8', 'replace') if match else None
 
 
 def get_package_name():
     """
     Dynamically extract package name (applicationId) from Android build files.
     Checks both build.gradle.kts and build.gradle files.
+    The result is cached until either gradle file changes.
     Returns the package name or None if not found.
     """
+    return _read_package_name(
+        _file_cache_key(PATHS['gradle_kts']),
+        _file_cache_key(PATHS['gradle'])
+    )
+
+
+@lru_cache(maxsize=1)
+def _read_package_name(gradle_kts_key, gradle_key):
+    """Read the package name for the given gradle file cache keys"""
     gradle_kts_path = PATHS['gradle_kts']
     gradle_path = PATHS['gradle']
 
     # Try build.gradle.kts first
-    if gradle_kts_path.exists():
+    if gradle_kts_key:
         try:
-            with open(gradle_kts_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                match = PATTERNS['package_name_kts'].search(content)
-                if match:
-                    return match.group(1)
+            package_name = _search_file(gradle_kts_path, _PKG_KTS)
+            if package_name:
+                return package_name
         except Exception as e:
             print(f"{YELLOW}Warning: Could not read {gradle_kts_path}: {e}{NC}")
 
     # Try build.gradle (Groovy format)
-    if gradle_path.exists():
+    if gradle_key:
         try:
-            with open(gradle_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                match = PATTERNS['package_name_groovy'].search(content)
-                if match:
-                    return match.group(1)
+            package_name = _search_file(gradle_path, _PKG_GROOVY)
+            if package_name:
+                return package_name
         except Exception as e:
             print(f"{YELLOW}Warning: Could not read {gradle_path}: {e}{NC}")
 
@@ -107,34 +250,39 @@ def get_package_name():
 def get_app_label_from_manifest():
     """
     Extract app label from AndroidManifest.xml
+    Cached until the manifest changes.
     Returns the app label or None if not found
     """
+    return _read_app_label(_file_cache_key(PATHS['manifest']))
+
+
+@lru_cache(maxsize=1)
+def _read_app_label(manifest_key):
+    """Read the app label for the given manifest cache key"""
     manifest_path = PATHS['manifest']
 
-    if not manifest_path.exists():
+    if not manifest_key:
         print(f"{YELLOW}Warning: AndroidManifest.xml not found at {manifest_path}{NC}")
         return None
 
     try:
-        with open(manifest_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            match = PATTERNS['app_label'].search(content)
-            if match:
-                label = match.group(1)
-                # If it's a string resource reference, try to get actual value
-                if label.startswith('@string/'):
-                    return None
-                # Decode HTML entities like &amp; to &
-                label = label.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
-                return label
-            else:
-                print(f"{YELLOW}Warning: Could not find android:label in AndroidManifest.xml{NC}")
+        label = _search_file(manifest_path, _APP_LABEL)
+        if label:
+            # If it's a string resource reference, try to get actual value
+            if label.startswith('@string/'):
                 return None
+            # Decode HTML entities like &amp; to &
+            label = label.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
+            return label
+        else:
+            print(f"{YELLOW}Warning: Could not find android:label in AndroidManifest.xml{NC}")
+            return None
     except Exception as e:
         print(f"{YELLOW}Warning: Could not read AndroidManifest.xml: {e}{NC}")
         return None
 
 
+@lru_cache(maxsize=256)
 def sanitize_filename(name):
     """
     Sanitize app name for use in filename (cross-platform compatible)
@@ -142,12 +290,11 @@ def sanitize_filename(name):
     """
     # Replace & with 'and'
     name = name.replace('&', 'and')
-    # Remove Windows forbidden characters: < > : " / \ | ? *
-    name = PATTERNS['sanitize_special'].sub('', name)
-    # Remove any remaining special characters except alphanumeric, spaces, hyphens, underscores
-    name = PATTERNS['sanitize_non_word'].sub('', name)
+    # Remove special characters except alphanumeric, spaces, hyphens, underscores
+    # (this also covers the Windows forbidden characters < > : " / \ | ? *)
+    name = _SANITIZE_NON_WORD.sub('', name)
     # Replace multiple spaces/hyphens with single underscore
-    name = PATTERNS['sanitize_spaces'].sub('_', name)
+    name = _SANITIZE_SPACES.sub('_', name)
     # Remove leading/trailing underscores
     name = name.strip('_')
     return name
@@ -157,18 +304,39 @@ def get_formatted_date():
     """
     Get current date formatted as 'DD_MMM' (e.g., '07_Jan')
     """
-    return datetime.now().strftime('%d_%b')
+    return _format_date(date.today())
+
+
+@lru_cache(maxsize=1)
+def _format_date(day):
+    """Format a date as 'DD_MMM', cached for the current day"""
+    return day.strftime('%d_%b')
+
+
+def _list_files_with_extension(directory, file_extension):
+    """
+    List the files in directory ending with .file_extension as DirEntry objects
+    (one scandir pass, no glob matching). Returns [] if the directory is missing.
+    """
+    suffix = '.' + file_extension
+    try:
+        with os.scandir(directory) as entries:
+            return [entry for entry in entries if entry.name.endswith(suffix) and entry.is_file()]
+    except FileNotFoundError:
+        return []
 
 
 def rename_build_files(output_dir, file_extension, app_label=None):
     """
     Rename APK/AAB files with app label and date
     Parameters:
-        output_dir: Directory containing the build files (Path object)
+        output_dir: Directory containing the build files (Path or string)
         file_extension: File extension to search for ('apk' or 'aab')
         app_label: Optional app label (if None, will extract from AndroidManifest.xml)
     """
-    if not output_dir.exists():
+    # Work with the plain string path, no Path objects per file
+    output_dir = os.fspath(output_dir)
+    if not os.path.isdir(output_dir):
         print(f"{YELLOW}Warning: Output directory {output_dir} does not exist{NC}")
         return
 
@@ -187,7 +355,7 @@ def rename_build_files(output_dir, file_extension, app_label=None):
     date_str = get_formatted_date()
 
     # Find all files with the specified extension
-    build_files = list(output_dir.glob(f"*.{file_extension}"))
+    build_files = _list_files_with_extension(output_dir, file_extension)
 
     if not build_files:
         print(f"{YELLOW}Warning: No {file_extension.upper()} files found in {output_dir}{NC}")
@@ -195,9 +363,10 @@ def rename_build_files(output_dir, file_extension, app_label=None):
 
     print(f"\n{BLUE}Renaming {file_extension.upper()} files...{NC}")
 
-    for file_path in build_files:
+    arch_search = _ARCH.search
+    for entry in build_files:
         # Check if file contains architecture info (e.g., arm64-v8a)
-        arch_match = PATTERNS['architecture'].search(file_path.name)
+        arch_match = arch_search(entry.name)
 
         if arch_match:
             # Include architecture in filename
@@ -207,14 +376,15 @@ def rename_build_files(output_dir, file_extension, app_label=None):
             # No architecture info
             new_name = f"{sanitized_name}_{date_str}.{file_extension}"
 
-        new_path = output_dir / new_name
+        new_path = os.path.join(output_dir, new_name)
 
         # Rename the file
         try:
-            shutil.move(str(file_path), str(new_path))
-            print(f"{GREEN}  ✓ Renamed: {file_path.name} → {new_name}{NC}")
-        except Exception as e:
-            print(f"{RED}  ✗ Failed to rename {file_path.name}: {e}{NC}")
+            # Same directory, so a single rename syscall is enough
+            os.replace(entry.path, new_path)
+            print(f"{GREEN}  ✓ Renamed: {entry.name} → {new_name}{NC}")
+        except OSError as e:
+            print(f"{RED}  ✗ Failed to rename {entry.name}: {e}{NC}")
 
 
 def display_build_size(file_type, directory):
@@ -228,20 +398,131 @@ def display_build_size(file_type, directory):
     Returns:
         None
     """
-    # Convert to Path object if string
-    build_dir = Path(directory) if isinstance(directory, str) else directory
+    directory = os.fspath(directory)
 
     # Get files with the specified extension
-    build_files = list(build_dir.glob(f"*.{file_type}")) if build_dir.exists() else []
+    build_files = _list_files_with_extension(directory, file_type)
 
     if build_files:
-        for build_file in build_files:
-            size_bytes = build_file.stat().st_size
+        for entry in build_files:
+            size_bytes = entry.stat().st_size
             size_mb = round(size_bytes / 1048576, 2)
             # Display with uppercase file type (APK, AAB)
-            print(f"{BLUE}{file_type.upper()}: {build_file.name} | Size: {size_mb} MB{NC}")
+            print(f"{BLUE}{file_type.upper()}: {entry.name} | Size: {size_mb} MB{NC}")
     else:
-        print(f"{RED}{file_type.upper()} file not found in {build_dir}{NC}")
+        print(f"{RED}{file_type.upper()} file not found in {directory}{NC}")
+
+
+# Project files whose contents decide whether a build can skip `flutter clean`
+FINGERPRINT_FILES = ("pubspec.yaml", "pubspec.lock")
+# Source trees whose file mtimes/sizes are part of the fingerprint
+FINGERPRINT_DIRS = ("lib", "android", "ios")
+# Generated/cache directories skipped while walking the source trees
+FINGERPRINT_SKIP_DIRS = {"build", ".gradle", ".cxx", ".dart_tool", "Pods", ".symlinks"}
+
+
+def _project_fingerprint():
+    """
+    Fingerprint the project: pubspec contents plus path, mtime and size of
+    every file under lib/, android/ and ios/ (one scandir walk, no reads).
+    Returns a hex digest string.
+    """
+    digest = hashlib.sha256()
+    for name in FINGERPRINT_FILES:
+        try:
+            with open(name, 'rb') as file:
+                digest.update(file.read())
+        except OSError:
+            digest.update(b'-')
+
+    entries = []
+    pending = [d for d in FINGERPRINT_DIRS if os.path.isdir(d)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in FINGERPRINT_SKIP_DIRS:
+                            pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        entries.append(f"{entry.path}\0{stat.st_mtime_ns}\0{stat.st_size}")
+        except OSError:
+            continue
+
+    entries.sort()
+    digest.update("\n".join(entries).encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+def _load_build_fingerprints():
+    """Load the {build key: fingerprint} map saved after successful builds"""
+    try:
+        with open(PATHS['build_fingerprint'], 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def clean_if_changed(build_key, force_clean=False):
+    """
+    Run `flutter clean` unless the project is unchanged since the last
+    successful build with the same build_key.
+    Parameters:
+        build_key: Identifies the build type (e.g., the build command)
+        force_clean: Always clean, ignoring the saved fingerprint
+    Returns: True if `flutter clean` ran, False if it was skipped
+    """
+    if not force_clean and _load_build_fingerprints().get(build_key) == _project_fingerprint():
+        print(f"{BLUE}No changes since the last successful build, skipping clean (use --force-clean to clean){NC}")
+        return False
+    run_flutter_command(["flutter", "clean"], STEP_DESCRIPTIONS['clean'], save_log=True)
+    return True
+
+
+def remove_build_outputs(output_dir, file_extension):
+    """
+    Delete the APK/AAB files left in output_dir by earlier builds. Needed
+    when `flutter clean` is skipped, otherwise last run's renamed outputs
+    would be renamed/installed alongside the fresh build
+    Parameters:
+        output_dir: Directory containing the build files (Path or string)
+        file_extension: File extension to remove ('apk' or 'aab')
+    """
+    for entry in _list_files_with_extension(os.fspath(output_dir), file_extension):
+        try:
+            os.remove(entry.path)
+        except OSError as e:
+            print(f"{YELLOW}Warning: Could not remove old build file {entry.name}: {e}{NC}")
+
+
+def _write_build_fingerprints(fingerprints):
+    """Save the {build key: fingerprint} map, ignoring write errors"""
+    try:
+        with open(PATHS['build_fingerprint'], 'w', encoding='utf-8') as file:
+            json.dump(fingerprints, file)
+    except OSError:
+        pass
+
+
+def save_build_fingerprint(build_key):
+    """
+    Record the project fingerprint after a successful build, so the next
+    build of the same type can skip `flutter clean`
+    """
+    fingerprints = _load_build_fingerprints()
+    fingerprints[build_key] = _project_fingerprint()
+    _write_build_fingerprints(fingerprints)
+
+
+def forget_build_fingerprint(build_key):
+    """
+    Drop the saved fingerprint after a failed build, so the next build of
+    the same type runs `flutter clean` again
+    """
+    fingerprints = _load_build_fingerprints()
+    if fingerprints.pop(build_key, None) is not None:
+        _write_build_fingerprints(fingerprints)
 
 
 def common_build_process(
@@ -250,18 +531,20 @@ def common_build_process(
     build_description,
     output_dir,
     file_extension,
-    install_after=False
+    install_after=False,
+    force_clean=False
 ):
     """
     Common build process for all build types (APK, APK-split, AAB)
 
     Parameters:
         build_name: Display name for the build (e.g., "APK", "AAB")
-        build_command: List of flutter build command arguments
+        build_command: Sequence of flutter build command arguments
         build_description: Loading text for the build step
         output_dir: Path object where build output is located
         file_extension: "apk" or "aab"
         install_after: Boolean to install APK after build (default: False)
+        force_clean: Run `flutter clean` even if nothing changed (default: False)
 
     Returns:
         Boolean indicating success
@@ -269,20 +552,23 @@ def common_build_process(
     # Initial message
     print(f"{YELLOW}Building {build_name}...{NC}\n")
 
-    # Step 1: Clean the project
-    run_flutter_command(["flutter", "clean"], "Cleaning project...                                   ")
+    # Step 1: Clean the project (skipped if nothing changed since the last build)
+    build_key = " ".join(build_command)
+    if not clean_if_changed(build_key, force_clean):
+        # No clean, so drop last run's (renamed) outputs before building
+        remove_build_outputs(output_dir, file_extension)
 
     # Step 2: Get dependencies
-    run_flutter_command(["flutter", "pub", "get"], "Getting dependencies...                              ")
-
-    # Step 3: Generate localizations
-    run_flutter_command(["flutter", "gen-l10n"], "Generating localizations...                          ")
+    run_flutter_command(["flutter", "pub", "get"], STEP_DESCRIPTIONS['pub_get'], save_log=True)
 
-    # Step 4: Generate build files
-    run_flutter_command(["dart", "run", "build_runner", "build", "--delete-conflicting-outputs"], "Generating build files...                            ")
+    # Step 3-4: Generate localizations and build files in parallel
+    run_flutter_commands_parallel(CODEGEN_COMMANDS, STEP_DESCRIPTIONS['codegen'], save_log=True)
 
     # Step 5: Build (APK/AAB)
-    run_flutter_command(build_command, build_description)
+    if run_flutter_command(build_command, build_description, save_log=True):
+        save_build_fingerprint(build_key)
+    else:
+        forget_build_fingerprint(build_key)
 
     # Step 6: Rename build files with app label and date
     rename_build_files(output_dir, file_extension)
@@ -304,60 +590,54 @@ def common_build_process(
         # Success message
         print(f"\n{GREEN}✓ {build_name} built successfully!{NC}")
         # Open the directory containing the build
-        open_directory(str(output_dir))
+        open_directory(os.fspath(output_dir))
         return True
 
 
 @timer_decorator
-def build_apk():
+def build_apk(force_clean=False):
     """Build APK (Full Process)"""
     return common_build_process(
         build_name="APK (Full Process)",
-        build_command=[
-            "flutter", "build", "apk", "--release", "--obfuscate",
-            "--target-platform", "android-arm64", "--split-debug-info=./"
-        ],
-        build_description="Building APK...                                      ",
+        build_command=BUILD_COMMANDS['apk'],
+        build_description=STEP_DESCRIPTIONS['apk'],
         output_dir=PATHS['apk_output'],
         file_extension="apk",
-        install_after=False
+        install_after=False,
+        force_clean=force_clean
     )
 
 
 @timer_decorator
-def build_apk_split_per_abi():
+def build_apk_split_per_abi(force_clean=False):
     """Build APK with --split-per-abi"""
     return common_build_process(
         build_name="APK (split-per-abi)",
-        build_command=[
-            "flutter", "build", "apk", "--release", "--split-per-abi",
-            "--obfuscate", "--split-debug-info=./"
-        ],
-        build_description="Building APK (split-per-abi)...                      ",
+        build_command=BUILD_COMMANDS['apk_split'],
+        build_description=STEP_DESCRIPTIONS['apk_split'],
         output_dir=PATHS['apk_output'],
         file_extension="apk",
-        install_after=False
+        install_after=False,
+        force_clean=force_clean
     )
 
 
 @timer_decorator
-def build_aab():
+def build_aab(force_clean=False):
     """Build AAB"""
     return common_build_process(
         build_name="AAB",
-        build_command=[
-            "flutter", "build", "appbundle", "--release",
-            "--obfuscate", "--split-debug-info=./"
-        ],
-        build_description="Building AAB...                                      ",
+        build_command=BUILD_COMMANDS['aab'],
+        build_description=STEP_DESCRIPTIONS['aab'],
         output_dir=PATHS['aab_output'],
         file_extension="aab",
-        install_after=False
+        install_after=False,
+        force_clean=force_clean
     )
 
 
 @timer_decorator
-def build_ipa():
+def build_ipa(force_clean=False):
     """Build IPA for iOS App Store"""
     if is_windows():
         print(f"{RED}Error: iOS builds are not supported on Windows. macOS required.{NC}")
@@ -365,17 +645,15 @@ def build_ipa():
 
     print(f"{YELLOW}Building IPA (App Store)...{NC}\n")
 
-    # Step 1: Clean the project
-    run_flutter_command(["flutter", "clean"], "Cleaning project...                                   ")
+    # Step 1: Clean the project (skipped if nothing changed since the last build)
+    build_key = " ".join(BUILD_COMMANDS['ipa'])
+    clean_if_changed(build_key, force_clean)
 
     # Step 2: Get dependencies
-    run_flutter_command(["flutter", "pub", "get"], "Getting dependencies...                              ")
-
-    # Step 3: Generate localizations
-    run_flutter_command(["flutter", "gen-l10n"], "Generating localizations...                          ")
+    run_flutter_command(["flutter", "pub", "get"], STEP_DESCRIPTIONS['pub_get'], save_log=True)
 
-    # Step 4: Generate build files
-    run_flutter_command(["dart", "run", "build_runner", "build", "--delete-conflicting-outputs"], "Generating build files...                            ")
+    # Step 3-4: Generate localizations and build files in parallel
+    run_flutter_commands_parallel(CODEGEN_COMMANDS, STEP_DESCRIPTIONS['codegen'], save_log=True)
 
     # Step 5: Update iOS pods
     import os
@@ -383,23 +661,18 @@ def build_ipa():
     ios_dir = Path("ios")
     if ios_dir.exists():
         os.chdir("ios")
-        run_flutter_command(["pod", "deintegrate"], "Deintegrating pods...                                ")
-        run_flutter_command(["pod", "install"], "Installing pods...                                   ")
+        run_flutter_command(["pod", "deintegrate"], STEP_DESCRIPTIONS['pod_deintegrate'])
+        run_flutter_command(["pod", "install"], STEP_DESCRIPTIONS['pod_install'])
         os.chdir(current_dir)
 
     # Step 6: Build IPA
-    build_success = run_flutter_command(
-        [
-            "flutter", "build", "ipa", "--release",
-            "--obfuscate", "--split-debug-info=./",
-            "--export-method", "app-store"
-        ],
-        "Building IPA...                                      "
-    )
+    build_success = run_flutter_command(BUILD_COMMANDS['ipa'], STEP_DESCRIPTIONS['ipa'], save_log=True)
 
     if not build_success:
+        forget_build_fingerprint(build_key)
         print(f"\n{RED}✗ IPA build failed!{NC}")
         return False
+    save_build_fingerprint(build_key)
 
     # Step 7: Display IPA file info
     ipa_output = PATHS['ipa_output']
@@ -410,21 +683,19 @@ def build_ipa():
     print(f"{BLUE}IPA location: {ipa_output}{NC}")
     print(f"\n{YELLOW}Next step: Upload to App Store Connect using Transporter or:{NC}")
     print(f"  {GREEN}xcrun altool --upload-app -f <path-to-ipa> -t ios -u <apple-id> -p <app-specific-password>{NC}")
-    open_directory(str(ipa_output))
+    open_directory(os.fspath(ipa_output))
     return True
 
 
 @timer_decorator
-def release_run():
+def release_run(force_clean=False):
     """Build & Install Release APK"""
     return common_build_process(
         build_name="Release APK",
-        build_command=[
-            "flutter", "build", "apk", "--release", "--obfuscate",
-            "--target-platform", "android-arm64", "--split-debug-info=./"
-        ],
-        build_description="Building APK...                                      ",
+        build_command=BUILD_COMMANDS['apk'],
+        build_description=STEP_DESCRIPTIONS['apk'],
         output_dir=PATHS['apk_output'],
         file_extension="apk",
-        install_after=True
+        install_after=True,
+        force_clean=force_clean
     )
@@ -3,17 +3,64 @@
 Device Manager - Device selection and ADB commands
 """
 
+import os
+import atexit
+import queue
+import socket
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from common_utils import RED, GREEN, YELLOW, BLUE, NC
+from core.constants import PATTERNS
 from core.state import get_selected_device, set_selected_device
 
 
+# Set once the adb server is known to be running in this process
+_ADB_STARTED = False
+
+
+def _ensure_adb_server():
+    """
+    Make sure the adb server is running before the first adb call.
+    A quick connect to the server port skips the 'adb start-server' spawn when
+    it's already up. On failure this does nothing - the next adb call will
+    report the real error.
+    """
+    global _ADB_STARTED
+    if _ADB_STARTED:
+        return
+    _ADB_STARTED = True
+
+    port = int(os.environ.get('ANDROID_ADB_SERVER_PORT') or 5037)
+    try:
+        socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+        return
+    except OSError:
+        pass
+
+    try:
+        subprocess.run(["adb", "start-server"], capture_output=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+
+# Device models reported by 'adb devices -l', keyed by serial
+_DEVICE_MODELS = {}
+
+
+@lru_cache(maxsize=64)
 def get_device_model(serial):
     """
     Get the device model name for a given device serial.
+    Uses the model from 'adb devices -l' when available and only asks the
+    device (getprop) otherwise. Cached, since a serial's model never changes.
     Returns: Model name string or empty string if failed
     """
+    if serial in _DEVICE_MODELS:
+        return _DEVICE_MODELS[serial]
+
     try:
         result = subprocess.run(
             ["adb", "-s", serial, "shell", "getprop", "ro.product.model"],
@@ -30,14 +77,31 @@ def get_device_model(serial):
         return ""
 
 
+def get_device_models(devices):
+    """
+    Get the model names for several devices, querying them in parallel.
+    Returns: List of model names (empty string if unknown), in device order
+    """
+    if len(devices) < 2:
+        return [get_device_model(device) for device in devices]
+    with ThreadPoolExecutor(max_workers=len(devices)) as executor:
+        return list(executor.map(get_device_model, devices))
+
+
+@lru_cache(maxsize=1)
 def get_all_connected_devices():
     """
-    Get all connected Android devices/emulators
-    Returns: List of device serials, or empty list if none found
+    Get all connected Android devices/emulators.
+    Cached for the rest of the command, since several steps ask for the device
+    list - call get_all_connected_devices.cache_clear() after anything that
+    connects or disconnects devices.
+    The model of each device is recorded from the same 'adb devices -l' call.
+    Returns: Tuple of device serials, or empty tuple if none found
     """
+    _ensure_adb_server()
     try:
         result = subprocess.run(
-            ["adb", "devices"],
+            ["adb", "devices", "-l"],
             capture_output=True,
             text=True,
             encoding='utf-8',
@@ -46,28 +110,30 @@ def get_all_connected_devices():
         )
 
         if result.returncode == 0:
+            # One pass over "<serial>  device product:x model:Pixel_7 ..." lines;
+            # the header and offline/unauthorized devices don't match
             devices = []
-            lines = result.stdout.strip().split('\n')
-            # Skip the first line ("List of devices attached")
-            for line in lines[1:]:
-                if line.strip() and '\tdevice' in line:
-                    # Extract device serial (first part before tab)
-                    serial = line.split('\t')[0].strip()
-                    devices.append(serial)
-            return devices
-        return []
+            for match in PATTERNS['adb_device'].finditer(result.stdout):
+                serial, model = match.groups()
+                devices.append(serial)
+                if model:
+                    # adb shows non-alphanumerics as '_' (e.g. SM_G991B)
+                    _DEVICE_MODELS[serial] = model
+            return tuple(devices)
+        return ()
     except (FileNotFoundError, subprocess.TimeoutExpired):
-        return []
+        return ()
 
 
-def select_device_if_multiple():
+def _select_device(devices, kind=""):
     """
-    Check for connected devices and prompt user to select if multiple found.
+    Select a device from devices, prompting the user if there is more than one.
     Sets the global SELECTED_DEVICE variable.
+    Parameters:
+        devices: Sequence of device serials
+        kind: Label shown in the prompt, e.g. "USB " (empty for any device)
     Returns: True if device selected/available, False if no devices
     """
-    devices = get_all_connected_devices()
-
     if not devices:
         return False
 
@@ -77,9 +143,8 @@ def select_device_if_multiple():
         return True
 
     # Multiple devices found, ask user to select
-    print(f"\n{YELLOW}Multiple devices detected:{NC}")
-    for i, device in enumerate(devices, 1):
-        model = get_device_model(device)
+    print(f"\n{YELLOW}Multiple {kind}devices detected:{NC}")
+    for i, (device, model) in enumerate(zip(devices, get_device_models(devices)), 1):
         model_str = f" {model}" if model else ""
         # Check if it's a network device
         if ':' in device:
@@ -90,7 +155,7 @@ def select_device_if_multiple():
     print()
     while True:
         try:
-            choice = input(f"Select device (1-{len(devices)}): ").strip()
+            choice = input(f"Select {kind}device (1-{len(devices)}): ").strip()
             index = int(choice) - 1
             if 0 <= index < len(devices):
                 set_selected_device(devices[index])
@@ -105,6 +170,15 @@ def select_device_if_multiple():
             return False
 
 
+def select_device_if_multiple():
+    """
+    Check for connected devices and prompt user to select if multiple found.
+    Sets the global SELECTED_DEVICE variable.
+    Returns: True if device selected/available, False if no devices
+    """
+    return _select_device(get_all_connected_devices())
+
+
 def build_adb_cmd(cmd_list, require_device=True):
     """
     Build ADB command with device selection if needed.
@@ -128,6 +202,139 @@ def build_adb_cmd(cmd_list, require_device=True):
     return adb_cmd
 
 
+class AdbShell:
+    """
+    A persistent 'adb shell' session for one device.
+    Running several shell commands through one session avoids starting a new
+    adb process (and adbd connection) for each of them. Each command is
+    followed by an echo of a sentinel plus its exit code, which marks where
+    its output ends.
+    """
+
+    SENTINEL = "__FDEV_CMD_DONE__"
+    # Echo command printing the sentinel; the empty quotes keep the sentinel
+    # itself out of the input line, in case the shell echoes its input
+    SENTINEL_ECHO = 'echo __FDEV_""CMD_DONE__$?'
+
+    def __init__(self, serial=None):
+        self.serial = serial
+        self.process = None
+        self.lines = None
+        self.lock = threading.Lock()
+
+    def _start(self):
+        cmd = ["adb"] + (["-s", self.serial] if self.serial else []) + ["shell"]
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1
+        )
+        # Read stdout on a background thread so run() can wait with a timeout
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_output, args=(self.process, self.lines), daemon=True).start()
+
+    @staticmethod
+    def _read_output(process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def run(self, command, timeout=5):
+        """
+        Run a shell command on the device.
+        Returns: subprocess.CompletedProcess with returncode and stdout
+        Raises: subprocess.TimeoutExpired, or OSError if the session died
+        """
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self._start()
+
+            try:
+                self.process.stdin.write(f"{command}; {self.SENTINEL_ECHO}\n")
+                self.process.stdin.flush()
+            except OSError:
+                self.close()
+                raise
+
+            output = []
+            while True:
+                try:
+                    line = self.lines.get(timeout=timeout)
+                except queue.Empty:
+                    self.close()
+                    raise subprocess.TimeoutExpired(command, timeout)
+
+                if line is None:
+                    self.close()
+                    raise OSError("adb shell session ended")
+
+                # The sentinel may follow output that had no trailing newline
+                before, found, after = line.partition(self.SENTINEL)
+                if found:
+                    if before:
+                        output.append(before)
+                    status = after.strip()
+                    if not status.isdigit():
+                        # Not our exit code line, the session can't be trusted
+                        self.close()
+                        raise OSError(f"unexpected adb shell output: {line.strip()}")
+                    returncode = int(status)
+                    return subprocess.CompletedProcess(command, returncode, ''.join(output), '')
+                output.append(line)
+
+    def close(self):
+        """Stop the shell session"""
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process = None
+
+
+# One persistent shell per device serial
+_ADB_SHELLS = {}
+
+
+def _close_adb_shells():
+    for shell in _ADB_SHELLS.values():
+        shell.close()
+
+
+atexit.register(_close_adb_shells)
+
+
+def run_adb_shell(command, timeout=5):
+    """
+    Run a shell command on the selected device through a persistent adb shell.
+    Falls back to a one-off 'adb shell' call if the session can't be used.
+    Parameters:
+        command: Shell command string (quote arguments with shlex.quote)
+        timeout: Seconds to wait for the command to finish
+    Returns: subprocess.CompletedProcess with returncode and stdout
+    """
+    serial = get_selected_device()
+    shell = _ADB_SHELLS.get(serial)
+    if shell is None:
+        shell = _ADB_SHELLS[serial] = AdbShell(serial)
+
+    try:
+        return shell.run(command, timeout=timeout)
+    except OSError:
+        return subprocess.run(
+            build_adb_cmd(["shell", command]),
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout
+        )
+
+
 def ensure_device_connected(error_message=None, additional_help=None):
     """
     Wrapper function to check and select Android device
@@ -172,36 +379,4 @@ def select_usb_device():
     Sets the global SELECTED_DEVICE variable.
     Returns: True if device selected/available, False if no devices
     """
-    devices = get_usb_devices()
-
-    if not devices:
-        return False
-
-    if len(devices) == 1:
-        # Only one USB device, auto-select it
-        set_selected_device(devices[0])
-        return True
-
-    # Multiple USB devices found, ask user to select
-    print(f"\n{YELLOW}Multiple USB devices detected:{NC}")
-    for i, device in enumerate(devices, 1):
-        model = get_device_model(device)
-        model_str = f" {model}" if model else ""
-        print(f"  {i}.{model_str} {device} {GREEN}(USB){NC}")
-
-    print()
-    while True:
-        try:
-            choice = input(f"Select USB device (1-{len(devices)}): ").strip()
-            index = int(choice) - 1
-            if 0 <= index < len(devices):
-                set_selected_device(devices[index])
-                print(f"{GREEN}✓ Selected: {devices[index]}{NC}\n")
-                return True
-            else:
-                print(f"{RED}Invalid choice. Please enter a number between 1 and {len(devices)}{NC}")
-        except ValueError:
-            print(f"{RED}Invalid input. Please enter a number{NC}")
-        except KeyboardInterrupt:
-            print(f"\n{YELLOW}Selection cancelled{NC}")
-            return False
+    return _select_device(get_usb_devices(), "USB ")
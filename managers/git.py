@@ -6,8 +6,13 @@ Git Manager - Git tag, commit, version functions
 import os
 import sys
 import time
+import shutil
 import subprocess
+import importlib.util
 from pathlib import Path
+from functools import lru_cache
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 
 from common_utils import (
     RED, GREEN, YELLOW, BLUE, NC,
@@ -17,72 +22,182 @@ from common_utils import (
 from core.constants import PATTERNS
 from managers.build import run_flutter_command
 
+# Optional in-process git (libgit2) for read-only local queries; falls back
+# to the git CLI when not installed
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Terminal clear after a commit: `cls` on Windows, otherwise the ANSI
+# sequence `clear` would print (erase screen + scrollback, cursor home),
+# written directly so no shell is spawned
+_CLEAR_CMD = 'cls' if is_windows() else None
+_CLEAR_SEQUENCE = b"\x1b[H\x1b[2J\x1b[3J"
+
+# Environment for git calls whose output is captured: C locale (untranslated,
+# stable messages and no catalog loading) and no optional index lock/refresh
+# writes from read-only commands like status and diff
+_GIT_ENV = dict(os.environ, LC_ALL="C", GIT_OPTIONAL_LOCKS="0")
+
+# Generated and lock files (matching GENERATED_FILE in gemini_api.py): only a
+# line count is sent to the AI for them, so smart_commit asks git for
+# --numstat instead of their full patch. Pathspecs are from the repo top
+GENERATED_PATHSPECS = [
+    ':(top,glob)**/pubspec.lock',
+    ':(top,glob)**/Podfile.lock',
+    ':(top,glob)**/*.g.dart',
+    ':(top,glob)**/*.freezed.dart',
+    ':(top,glob)**/*.mocks.dart',
+    ':(top,glob)**/*.gr.dart',
+    ':(top,glob)**/*.config.dart',
+]
+# Diff section standing in for a generated file (as condensed by gemini_api)
+GENERATED_SECTION = "diff --git a/{path} b/{path}\n[generated or binary file changed: +{added} / -{removed} lines]"
+
+# Installed gemini_api.py, loaded lazily by _load_gemini()
+GEMINI_SCRIPT = Path.home() / "scripts" / "flutter-tools" / "gemini_api.py"
+_gemini_module = None
+
+
+def read_pubspec():
+    """
+    Read pubspec.yaml from the current directory, cached until the file
+    changes (keyed on absolute path, mtime and size, so a write or a
+    directory change invalidates it)
+    Returns: File content, or None if pubspec.yaml doesn't exist
+    """
+    path = os.path.abspath("pubspec.yaml")
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _read_pubspec(path, stat.st_mtime_ns, stat.st_size)
 
-def get_version_from_pubspec():
-    """Get the version from pubspec.yaml using regex"""
-    if os.path.isfile("pubspec.yaml"):
-        with open("pubspec.yaml", 'r', encoding='utf-8') as file:
-            try:
-                content = file.read()
-                # Use regex to find the version field in pubspec.yaml
-                version_match = PATTERNS['version'].search(content)
-                if version_match:
-                    version = version_match.group(1).strip()
-                    # Remove quotes if present and split by + to get only version number
-                    version = version.strip('"\'').split('+')[0]
-                    return version
-                else:
-                    print(f"{RED}Error: Could not find 'version' field in pubspec.yaml.{NC}")
-                    return None
-            except Exception as e:
-                print(f"{RED}Error: Could not read pubspec.yaml: {e}{NC}")
-                return None
-    else:
+
+@lru_cache(maxsize=8)
+def _read_pubspec(path, mtime_ns, size):
+    """Read pubspec.yaml for the given path/mtime/size cache key"""
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+@lru_cache(maxsize=1)
+def parse_pubspec_version(content):
+    """
+    Get the version and build number from pubspec.yaml content with one
+    regex scan (cached for the current content)
+    Returns: (version, build_number) tuple, e.g. ('1.0.0', 5) for '1.0.0+5';
+             build_number is None without '+N', both are None without a version
+    """
+    version_match = PATTERNS['pubspec_version'].search(content)
+    if not version_match:
+        return (None, None)
+    build = version_match.group(2)
+    return (version_match.group(1), int(build) if build else None)
+
+
+def parse_build_number(content):
+    """Get the build number from pubspec.yaml content (e.g., from '1.0.0+5' returns 5)"""
+    return parse_pubspec_version(content)[1]
+
+
+def get_version_from_pubspec(content=None):
+    """Get the version from pubspec.yaml using regex
+    Parameters:
+        content: Already loaded pubspec.yaml content (read from disk if None)
+    """
+    if content is None:
+        try:
+            content = read_pubspec()
+        except Exception as e:
+            print(f"{RED}Error: Could not read pubspec.yaml: {e}{NC}")
+            return None
+
+    if content is None:
         print(f"{RED}Error: pubspec.yaml not found in the current directory.{NC}")
         print(f"{YELLOW}Please run this command from the root of a Flutter project.{NC}")
         return None
 
+    # Version number without quotes or the +build suffix
+    version = parse_pubspec_version(content)[0]
+    if version:
+        return version
+    else:
+        print(f"{RED}Error: Could not find 'version' field in pubspec.yaml.{NC}")
+        return None
+
 
 def parse_version(version_str):
     """Parse version string (e.g., 'v1.2.3' or '1.2.3') into tuple (1, 2, 3)"""
-    # Remove 'v' prefix if present
-    version_str = version_str.lstrip('v')
+    # Only major.minor.patch is used; anything that doesn't start with it is skipped
+    match = PATTERNS['tag_version'].match(version_str)
+    return tuple(map(int, match.groups())) if match else None
+
+
+def _get_local_tags_in_process():
+    """
+    List local tag names with pygit2, without spawning git
+    Returns: list of tag names, or None if pygit2 is unavailable or fails
+    """
+    if pygit2 is None:
+        return None
     try:
-        parts = version_str.split('.')
-        return tuple(int(p) for p in parts[:3])  # Return only major.minor.patch
-    except:
+        repo_path = pygit2.discover_repository(os.getcwd())
+        if repo_path is None:
+            return None
+        repo = pygit2.Repository(repo_path)
+        return [name[len('refs/tags/'):] for name in repo.references
+                if name.startswith('refs/tags/')]
+    except Exception:
         return None
 
 
 def get_all_tags():
-    """Get all tags from both local and remote repositories"""
+    """
+    Get all tags from both local and remote repositories.
+    Local tags are read in-process when pygit2 is installed; otherwise both
+    git processes are started up front, so the local listing runs while
+    ls-remote waits on the network.
+    """
     all_tags = set()
 
-    # Get local tags
-    try:
-        result = subprocess.run(["git", "tag", "-l"],
-                              capture_output=True, text=True, encoding='utf-8', errors='replace')
-        if result.stdout.strip():
-            local_tags = result.stdout.strip().split('\n')
-            all_tags.update(local_tags)
-    except Exception as e:
-        print(f"{YELLOW}Warning: Could not get local tags: {e}{NC}")
-
-    # Get remote tags
-    try:
-        result = subprocess.run(["git", "ls-remote", "--tags", "origin"],
-                              capture_output=True, text=True, encoding='utf-8', errors='replace')
-        if result.stdout.strip():
-            for line in result.stdout.strip().split('\n'):
-                # Extract tag name from "hash refs/tags/v1.0.0"
-                if 'refs/tags/' in line:
-                    tag = line.split('refs/tags/')[-1]
-                    # Skip ^{} references
-                    if not tag.endswith('^{}'):
-                        all_tags.add(tag)
-    except Exception as e:
-        print(f"{YELLOW}Warning: Could not get remote tags: {e}{NC}")
+    # Start local (for-each-ref) and remote (ls-remote) listings together;
+    # --refs drops the peeled "^{}" lines on the remote side
+    commands = [
+        ("local", ["git", "for-each-ref", "--format=%(refname:strip=2)", "refs/tags"]),
+        ("remote", ["git", "ls-remote", "--tags", "--refs", "origin"]),
+    ]
+    local_tags = _get_local_tags_in_process()
+    if local_tags is not None:
+        all_tags.update(local_tags)
+        commands = commands[1:]
+    processes = []
+    for label, cmd in commands:
+        try:
+            processes.append((label, subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                text=True, encoding='utf-8', errors='replace', env=_GIT_ENV
+            )))
+        except Exception as e:
+            print(f"{YELLOW}Warning: Could not get {label} tags: {e}{NC}")
+
+    for label, process in processes:
+        try:
+            stdout, _ = process.communicate()
+        except Exception as e:
+            print(f"{YELLOW}Warning: Could not get {label} tags: {e}{NC}")
+            continue
+        if label == "local":
+            all_tags.update(stdout.splitlines())
+        else:
+            # Extract tag name from "hash\trefs/tags/v1.0.0"
+            for line in stdout.splitlines():
+                tag = line.rpartition('refs/tags/')[2]
+                if tag:
+                    all_tags.add(tag)
 
+    all_tags.discard('')
     return sorted(all_tags)
 
 
@@ -92,37 +207,32 @@ def increment_version(version_tuple):
     return (major, minor, patch + 1)
 
 
-def get_build_number_from_pubspec():
-    """Get the build number from pubspec.yaml (e.g., from '1.0.0+5' returns 5)"""
-    if os.path.isfile("pubspec.yaml"):
-        with open("pubspec.yaml", 'r', encoding='utf-8') as file:
-            try:
-                content = file.read()
-                # Find version line with build number
-                version_match = PATTERNS['version_with_build'].search(content)
-                if version_match:
-                    build_number = int(version_match.group(2))
-                    return build_number
-                return None
-            except Exception:
-                return None
-    return None
+def get_build_number_from_pubspec(content=None):
+    """Get the build number from pubspec.yaml (e.g., from '1.0.0+5' returns 5)
+    Parameters:
+        content: Already loaded pubspec.yaml content (read from disk if None)
+    """
+    if content is None:
+        try:
+            content = read_pubspec()
+        except Exception:
+            return None
+    return parse_build_number(content) if content is not None else None
 
 
 def update_pubspec_version(new_version):
     """Update version in pubspec.yaml file, preserving and incrementing build number
     Returns: (success, build_number) tuple
     """
-    if not os.path.isfile("pubspec.yaml"):
-        print(f"{RED}Error: pubspec.yaml not found in the current directory.{NC}")
-        return (False, None)
-
     try:
-        with open("pubspec.yaml", 'r', encoding='utf-8') as file:
-            content = file.read()
+        # Read once; the build number and the version line come from the same content
+        content = read_pubspec()
+        if content is None:
+            print(f"{RED}Error: pubspec.yaml not found in the current directory.{NC}")
+            return (False, None)
 
         # Get current build number
-        current_build = get_build_number_from_pubspec()
+        current_build = parse_build_number(content)
 
         # Increment build number or start from 1
         new_build = (current_build + 1) if current_build is not None else 1
@@ -131,14 +241,19 @@ def update_pubspec_version(new_version):
         new_version_with_build = f"{new_version}+{new_build}"
 
         # Find the version line and replace it
-        new_content = PATTERNS['version_line'].sub(
+        new_content, replaced = PATTERNS['version_line'].subn(
             f'version: {new_version_with_build}',
             content
         )
+        if replaced == 0:
+            print(f"{RED}Error: No version line found in pubspec.yaml{NC}")
+            return (False, None)
+        if new_content == content:
+            # Already at this version; nothing to write
+            return (True, current_build)
 
         # Write back to file
-        with open("pubspec.yaml", 'w', encoding='utf-8') as file:
-            file.write(new_content)
+        Path("pubspec.yaml").write_text(new_content, encoding='utf-8')
 
         print(f"{GREEN}  Build number: {current_build or 0} → {new_build}{NC}")
         return (True, new_build)
@@ -149,31 +264,20 @@ def update_pubspec_version(new_version):
 
 def commit_version_change(version, build_number=None):
     """Commit the pubspec.yaml version change"""
-    # Add pubspec.yaml to staging
-    result = subprocess.run(
-        ["git", "add", "pubspec.yaml"],
-        capture_output=True,
-        text=True,
-        encoding='utf-8',
-        errors='replace'
-    )
-
-    if result.returncode != 0:
-        print(f"{RED}Failed to stage pubspec.yaml{NC}")
-        return False
-
     # Commit with version bump message
     if build_number:
         commit_message = f"chore: bump version to {version}+{build_number}"
     else:
         commit_message = f"chore: bump version to {version}"
 
+    # Stage and commit only pubspec.yaml in one process (--only)
     result = subprocess.run(
-        ["git", "commit", "-m", commit_message],
+        ["git", "commit", "--only", "pubspec.yaml", "-m", commit_message],
         capture_output=True,
         text=True,
         encoding='utf-8',
-        errors='replace'
+        errors='replace',
+        env=_GIT_ENV
     )
 
     if result.returncode != 0:
@@ -199,16 +303,10 @@ def create_and_push_tag():
             print(f"  ... and {len(all_tags) - 5} more")
         print()
 
-    # Find the latest version
-    latest_version = None
-    latest_tag = None
-
-    for tag in all_tags:
-        parsed = parse_version(tag)
-        if parsed:
-            if latest_version is None or parsed > latest_version:
-                latest_version = parsed
-                latest_tag = tag
+    # Find the latest version (each tag parsed once, compared in max());
+    # key= compares versions only, so the first tag of equal versions wins
+    parsed_tags = [(parsed, tag) for parsed, tag in zip(map(parse_version, all_tags), all_tags) if parsed]
+    latest_version, latest_tag = max(parsed_tags, key=itemgetter(0), default=(None, None))
 
     # Determine new version
     if latest_version:
@@ -256,23 +354,136 @@ def create_and_push_tag():
         print(f"{RED}Failed to create git tag.{NC}")
         return False
 
-    # Step 4: Push commit to remote
-    print(f"{BLUE}Pushing commit to remote...{NC}")
-    success = run_flutter_command(["git", "push"], f"Pushing commit...                                   ")
-    if not success:
-        print(f"{RED}Failed to push commit to remote.{NC}")
-        return False
-
-    # Step 5: Push tag to remote
-    success = run_flutter_command(["git", "push", "-u", "origin", new_tag], f"Pushing tag to remote...                            ")
+    # Step 4: Push commit and tag to remote in one atomic push
+    # (one round-trip; either both land on the remote or neither does)
+    print(f"{BLUE}Pushing commit and tag to remote...{NC}")
+    success = run_flutter_command(
+        ["git", "push", "--atomic", "origin", "HEAD", f"refs/tags/{new_tag}"],
+        f"Pushing commit and tag...                           "
+    )
     if not success:
-        print(f"{RED}Failed to push tag to remote.{NC}")
+        print(f"{RED}Failed to push commit and tag to remote.{NC}")
         return False
 
     print(f"\n{GREEN}✓ Version {new_version_str}+{build_number} updated, committed, and git tag {new_tag} created and pushed successfully!{NC}")
     return True
 
 
+def _ensure_git_repo():
+    """
+    Check that the current directory is inside a git work tree with
+    `git rev-parse --is-inside-work-tree`, which does not scan the index
+    or work tree like `git status` does
+    Returns: True if inside a git work tree, False otherwise
+    """
+    try:
+        result = subprocess.run(["git", "rev-parse", "--is-inside-work-tree"], capture_output=True, env=_GIT_ENV)
+    except FileNotFoundError:
+        return False
+    return result.stdout.strip() == b"true"
+
+
+def get_repo_status():
+    """
+    Get the current branch and uncommitted changes with one
+    `git status --porcelain -b` call (instead of separate repo check,
+    rev-parse and status processes).
+    Returns: (branch, changes) where changes is a list of porcelain lines,
+             or None if not a git repository / git not available
+    """
+    try:
+        result = subprocess.run(["git", "status", "--porcelain", "-b"],
+                              capture_output=True, text=True, encoding='utf-8', errors='replace', env=_GIT_ENV)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+
+    changes = result.stdout.splitlines()
+    branch = None
+    if changes and changes[0].startswith('## '):
+        # "## main...origin/main [ahead 1]", "## No commits yet on main" or "## HEAD (no branch)"
+        header = changes.pop(0)[3:]
+        for prefix in ("No commits yet on ", "Initial commit on "):
+            if header.startswith(prefix):
+                branch = header[len(prefix):]
+                break
+        else:
+            branch = header.split('...')[0].split(' ')[0]
+    return branch, changes
+
+
+def get_tracked_changes():
+    """
+    Summarise tracked changes with one `git status --porcelain -z -b`
+    call (untracked files don't count as changes, as with `git diff`,
+    but are reported separately)
+    Returns: (has_changes, has_unstaged, has_head, has_untracked) tuple
+    """
+    result = subprocess.run(["git", "status", "--porcelain", "-z", "-b"],
+                            capture_output=True, env=_GIT_ENV)
+    entries = result.stdout.split(b'\0')
+    has_head = True
+    if entries and entries[0].startswith(b'## '):
+        header = entries.pop(0)
+        has_head = not header.startswith((b'## No commits yet on ', b'## Initial commit on '))
+
+    has_changes = has_unstaged = has_untracked = False
+    skip_next = False
+    for entry in entries:
+        if skip_next:
+            # Original path of a rename/copy entry
+            skip_next = False
+            continue
+        if len(entry) < 3:
+            continue
+        if entry.startswith(b'?? '):
+            has_untracked = True
+            continue
+        has_changes = True
+        if entry[1:2] != b' ':
+            has_unstaged = True
+        skip_next = entry[0:1] in (b'R', b'C')
+    return has_changes, has_unstaged, has_head, has_untracked
+
+
+def get_worktree_changes():
+    """
+    Get changed and untracked files with one
+    `git status --porcelain=v2 -z --untracked-files=all` call. The v2 -z
+    records carry unquoted paths, and untracked directories are listed
+    file by file.
+    Returns: (modified_files, untracked_files) lists,
+             or None if not a git repository / git not available
+    """
+    try:
+        result = subprocess.run(["git", "status", "--porcelain=v2", "-z", "--untracked-files=all"],
+                                capture_output=True, text=True, encoding='utf-8', errors='replace', env=_GIT_ENV)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+
+    modified_files = []
+    untracked_files = []
+    records = iter(result.stdout.split('\0'))
+    for record in records:
+        kind = record[:1]
+        if kind == '?':
+            untracked_files.append(record[2:])
+        elif kind == '1':
+            # 1 XY sub mH mI mW hH hI path
+            modified_files.append(record.split(' ', 8)[8])
+        elif kind == '2':
+            # 2 XY sub mH mI mW hH hI Xscore path, then the original path
+            modified_files.append(record.split(' ', 9)[9])
+            next(records, None)
+        elif kind == 'u':
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path (unmerged)
+            modified_files.append(record.split(' ', 10)[10])
+    return modified_files, untracked_files
+
+
 def discard_changes(discard_all=True):
     """Discard all uncommitted changes in the current git repository
 
@@ -281,37 +492,20 @@ def discard_changes(discard_all=True):
     """
     print(f"{YELLOW}Discarding uncommitted changes...{NC}\n")
 
-    # Check if git repository
-    try:
-        subprocess.run(["git", "status"], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
+    # Check if git repository and get changes in one call
+    changes = get_worktree_changes()
+    if changes is None:
         print(f"{RED}Error: Not a git repository or git not available{NC}")
         return False
 
     # Check for changes
     try:
-        # Get tracked file changes
-        result = subprocess.run(["git", "status", "--porcelain"],
-                              capture_output=True, text=True, encoding='utf-8', errors='replace')
-        changes = result.stdout.strip()
+        modified_files, untracked_files = changes
 
-        if not changes:
+        if not modified_files and not untracked_files:
             print(f"{GREEN}No uncommitted changes to discard{NC}")
             return True
 
-        # Parse and display changes
-        modified_files = []
-        untracked_files = []
-
-        for line in changes.split('\n'):
-            if line:
-                status = line[:2]
-                filename = line[3:]
-                if status.strip() == '??':
-                    untracked_files.append(filename)
-                else:
-                    modified_files.append(filename)
-
         # Show what will be discarded
         if modified_files:
             print(f"{BLUE}Modified/Staged files to reset ({len(modified_files)}):{NC}")
@@ -342,21 +536,21 @@ def discard_changes(discard_all=True):
         if modified_files:
             print(f"{BLUE}Resetting tracked files...{NC}")
             result = subprocess.run(["git", "checkout", "."],
-                                  capture_output=True, text=True, encoding='utf-8', errors='replace')
+                                  capture_output=True, text=True, encoding='utf-8', errors='replace', env=_GIT_ENV)
             if result.returncode != 0:
                 print(f"{RED}Error resetting tracked files: {result.stderr}{NC}")
                 return False
 
             # Also reset staged changes
             subprocess.run(["git", "reset", "HEAD"],
-                         capture_output=True, text=True, encoding='utf-8', errors='replace')
+                         capture_output=True, text=True, encoding='utf-8', errors='replace', env=_GIT_ENV)
             print(f"{GREEN}✓ Tracked files reset{NC}")
 
         # Remove untracked files if requested
         if untracked_files and discard_all:
             print(f"{BLUE}Removing untracked files...{NC}")
             result = subprocess.run(["git", "clean", "-fd"],
-                                  capture_output=True, text=True, encoding='utf-8', errors='replace')
+                                  capture_output=True, text=True, encoding='utf-8', errors='replace', env=_GIT_ENV)
             if result.returncode != 0:
                 print(f"{RED}Error removing untracked files: {result.stderr}{NC}")
                 return False
@@ -370,6 +564,73 @@ def discard_changes(discard_all=True):
         return False
 
 
+def get_commit_diff(has_head=True):
+    """
+    Get the diff of all changes (staged + unstaged) to describe in a commit
+    message. Generated files (GENERATED_PATHSPECS) are left out of the patch
+    and listed with their line counts from a concurrent `git diff --numstat`
+    Parameters:
+        has_head: False before the first commit (diffs the staged changes)
+    Returns: Diff text
+    """
+    diff_cmd = ["git", "diff", "--no-color", "HEAD"] if has_head else ["git", "diff", "--no-color", "--staged"]
+    numstat_process = subprocess.Popen(
+        diff_cmd + ["--numstat", "--"] + GENERATED_PATHSPECS,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, encoding='utf-8', errors='replace', env=_GIT_ENV
+    )
+    excludes = [spec.replace(':(top,', ':(top,exclude,', 1) for spec in GENERATED_PATHSPECS]
+    result = subprocess.run(diff_cmd + ["--", ":/"] + excludes,
+                            capture_output=True, text=True, encoding='utf-8', errors='replace', env=_GIT_ENV)
+    numstat, _ = numstat_process.communicate()
+
+    generated_sections = []
+    for line in numstat.splitlines():
+        added, removed, path = line.split('\t', 2)
+        # Binary files report '-' for both counts
+        generated_sections.append(GENERATED_SECTION.format(
+            path=path,
+            added=added if added != '-' else 0,
+            removed=removed if removed != '-' else 0
+        ))
+    return '\n'.join([result.stdout.strip()] + generated_sections).strip()
+
+
+def _clear_terminal():
+    """Clear the terminal without spawning `clear` on POSIX"""
+    if _CLEAR_CMD:
+        os.system(_CLEAR_CMD)
+        return
+    sys.stdout.flush()
+    os.write(sys.stdout.fileno(), _CLEAR_SEQUENCE)
+
+
+def _load_gemini():
+    """
+    Load the installed gemini_api.py on first use, by file path (sys.path
+    is left untouched)
+    Returns: The gemini_api module, or None if gemini_api.py is missing or
+             fails to import
+    """
+    global _gemini_module
+    if _gemini_module is None:
+        if not GEMINI_SCRIPT.exists():
+            print(f"{RED}Error: gemini_api.py not found{NC}")
+            return None
+        try:
+            module = sys.modules.get("gemini_api")
+            if module is None:
+                spec = importlib.util.spec_from_file_location("gemini_api", GEMINI_SCRIPT)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                sys.modules["gemini_api"] = module
+            _gemini_module = module
+        except ImportError as e:
+            print(f"{RED}Error importing Gemini API: {e}{NC}")
+            return None
+    return _gemini_module
+
+
 @timer_decorator
 def smart_commit():
     """Generate git diff, create commit message using Gemini AI, and commit"""
@@ -378,63 +639,30 @@ def smart_commit():
     current_dir = os.getcwd()
 
     # Check if git repository
-    try:
-        subprocess.run(["git", "status"], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
+    if not _ensure_git_repo():
         print(f"{RED}Error: Not a git repository or git not available{NC}")
         return False
 
-    # Check for changes
-    try:
-        result = subprocess.run(["git", "diff", "--staged"], capture_output=True, text=True, encoding='utf-8', errors='replace')
-        staged_changes = result.stdout.strip()
-
-        result = subprocess.run(["git", "diff"], capture_output=True, text=True, encoding='utf-8', errors='replace')
-        unstaged_changes = result.stdout.strip()
-
-        if not staged_changes and not unstaged_changes:
-            print(f"{YELLOW}No changes detected to commit{NC}")
-            return False
-
-    except subprocess.CalledProcessError as e:
-        print(f"{RED}Error checking git changes: {e}{NC}")
+    # Check for changes with one cheap status call (no diff text)
+    has_changes, unstaged_changes, has_head, has_untracked = get_tracked_changes()
+    if not has_changes:
+        print(f"{YELLOW}No changes detected to commit{NC}")
         return False
 
-    # Get all changes (staged + unstaged)
-    try:
-        result = subprocess.run(["git", "diff", "HEAD"], capture_output=True, text=True, encoding='utf-8', errors='replace')
-        all_changes = result.stdout.strip()
-
-        if not all_changes:
-            # If no changes from HEAD, get staged changes only
-            all_changes = staged_changes
-
-    except subprocess.CalledProcessError:
-        all_changes = staged_changes + "\n" + unstaged_changes
+    # Get all changes (staged + unstaged) with a single diff
+    all_changes = get_commit_diff(has_head)
 
     if not all_changes:
         print(f"{YELLOW}No changes to analyze{NC}")
         return False
 
-    # Import Gemini API
-    try:
-        script_dir = Path(__file__).parent
-        gemini_script = Path.home() / "scripts" / "flutter-tools" / "gemini_api.py"
-
-        if not gemini_script.exists():
-            print(f"{RED}Error: gemini_api.py not found{NC}")
-            return False
-
-        # Import the function
-        sys.path.insert(0, str(Path.home() / "scripts" / "flutter-tools"))
-        from gemini_api import generate_commit_message
-
-    except ImportError as e:
-        print(f"{RED}Error importing Gemini API: {e}{NC}")
+    # Import Gemini API (loaded once per process)
+    gemini = _load_gemini()
+    if gemini is None:
         return False
 
     # Generate commit message
-    commit_message = generate_commit_message(all_changes)
+    commit_message = gemini.generate_commit_message(all_changes)
 
     if not commit_message:
         print(f"{RED}Failed to generate commit message{NC}")
@@ -442,53 +670,47 @@ def smart_commit():
 
     print(f"\n{BLUE}Generated commit message:{NC}")
 
-    # Process commit message to add "-" to description lines
-    lines = commit_message.split('\n')
-    processed_lines = []
-
-    for i, line in enumerate(lines):
-        # Skip the first line (title) and empty lines
-        if i == 0 or line.strip() == "":
-            processed_lines.append(line)
-        else:
-            # Add "-" to non-empty description lines
-            if line.strip():
-                processed_lines.append(f"- {line}")
-            else:
-                processed_lines.append(line)
-
-    formatted_commit_message = '\n'.join(processed_lines)
+    # Process commit message to add "-" to non-empty description lines
+    # (the first line is the title and stays as is)
+    title, newline, body = commit_message.partition('\n')
+    formatted_commit_message = title + newline + PATTERNS['commit_body_line'].sub('- ', body)
     print(f"{GREEN}{formatted_commit_message}{NC}\n")
 
     # Ask for confirmation
     user_input = input(f"Proceed with this commit? (Y/n): ")
     if user_input.lower() == 'n':
+        # Don't serve the rejected message from the cache on the next run
+        gemini.forget_commit_message(all_changes)
         print(f"{YELLOW}Commit cancelled{NC}")
         return False
 
-    # Stage all changes if there are unstaged changes
+    # Stage all changes if there are unstaged changes. Tracked files are
+    # staged by `git commit --include -- .` itself, which keeps the same
+    # current-directory scope as `git add .`; `git add .` only runs when
+    # there are new files to pick up as well
+    commit_cmd = ["git", "commit", "-F", "-"]
     if unstaged_changes:
         print(f"{YELLOW}Staging all changes...{NC}")
-        try:
-            subprocess.run(["git", "add", "."], check=True)
-            print(f"{GREEN}✓ Changes staged{NC}")
-        except subprocess.CalledProcessError as e:
-            print(f"{RED}Error staging changes: {e}{NC}")
-            return False
+        if has_untracked:
+            try:
+                subprocess.run(["git", "add", "."], check=True)
+            except subprocess.CalledProcessError as e:
+                print(f"{RED}Error staging changes: {e}{NC}")
+                return False
+        else:
+            commit_cmd = ["git", "commit", "--include", "-F", "-", "--", "."]
+        print(f"{GREEN}✓ Changes staged{NC}")
 
-    # Commit with generated message
+    # Commit with generated message (read from stdin, no argument quoting)
     try:
-        subprocess.run(["git", "commit", "-m", formatted_commit_message], check=True)
+        subprocess.run(commit_cmd, input=formatted_commit_message, text=True, encoding='utf-8', check=True)
         print(f"\n{GREEN}✓ Commit successful!{NC}")
 
         # Wait 1.5 seconds to show success message
         time.sleep(1.5)
 
         # Clear terminal after successful commit
-        if is_windows():
-            os.system('cls')
-        else:
-            os.system('clear')
+        _clear_terminal()
 
         print(f"{GREEN}✓ Commit completed and terminal cleared!{NC}")
         print(f"{BLUE}Ready for next commit 🚀{NC}\n")
@@ -500,6 +722,62 @@ def smart_commit():
         return False
 
 
+def fast_forward_branch(branch_name, new_sha, old_sha):
+    """
+    Fast-forward a local branch to new_sha without checking it out.
+    update-ref only moves the branch if it still points at old_sha.
+    Returns: True if the branch moved, False if it was already at new_sha,
+             or None if the ref update failed
+    """
+    if new_sha == old_sha:
+        return False
+    result = subprocess.run(
+        ["git", "update-ref", f"refs/heads/{branch_name}", new_sha, old_sha],
+        capture_output=True, text=True,
+        encoding='utf-8', errors='replace', env=_GIT_ENV
+    )
+    return True if result.returncode == 0 else None
+
+
+def push_branches(branch_names, atomic=False):
+    """
+    Push local branches to origin in a single git push, one refspec per branch.
+    With atomic=True either every branch is updated on the remote or none is.
+    Returns: CompletedProcess of the push
+    """
+    cmd = ["git", "push"] + (["--atomic"] if atomic else []) + ["origin"]
+    cmd += [f"refs/heads/{name}:refs/heads/{name}" for name in branch_names]
+    return subprocess.run(
+        cmd,
+        capture_output=True, text=True,
+        encoding='utf-8', errors='replace', env=_GIT_ENV
+    )
+
+
+def get_conflicted_files(merge_output):
+    """
+    Get the conflicted files of a failed merge from its output, falling back
+    to `git diff --name-only --diff-filter=U` when a conflict line doesn't
+    name its file (e.g. modify/delete conflicts)
+    Returns: List of conflicted file paths (may be empty)
+    Raises: subprocess.CalledProcessError if the fallback git diff fails
+    """
+    conflicts = PATTERNS['merge_conflict'].findall(merge_output)
+    if conflicts and all(conflicts):
+        return list(dict.fromkeys(conflicts))
+
+    result = subprocess.run(
+        ["git", "diff", "--name-only", "--diff-filter=U"],
+        capture_output=True,
+        text=True,
+        check=True,
+        encoding='utf-8',
+        errors='replace',
+        env=_GIT_ENV
+    )
+    return result.stdout.splitlines()
+
+
 def sync_branches(branch_names):
     """Merge current branch with specified branches bidirectionally, push to all branches automatically
 
@@ -520,42 +798,29 @@ def sync_branches(branch_names):
     changes_made = False
     actions_taken = []
 
-    # Check if git repository
-    try:
-        subprocess.run(["git", "status"], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
+    # Check if git repository, get current branch and uncommitted changes in one call
+    status = get_repo_status()
+    if status is None:
         print(f"{RED}Error: Not a git repository or git not available{NC}")
         return False
 
-    # Get current branch name
-    try:
-        result = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                              capture_output=True, text=True, check=True,
-                              encoding='utf-8', errors='replace')
-        current_branch = result.stdout.strip()
-        print(f"{BLUE}Current branch: {current_branch}{NC}")
-    except subprocess.CalledProcessError as e:
-        print(f"{RED}Error getting current branch: {e}{NC}")
+    current_branch, changes = status
+    if not current_branch:
+        print(f"{RED}Error getting current branch{NC}")
         return False
+    print(f"{BLUE}Current branch: {current_branch}{NC}")
 
     # Check for uncommitted changes
-    try:
-        result = subprocess.run(["git", "status", "--porcelain"],
-                              capture_output=True, text=True, check=True,
-                              encoding='utf-8', errors='replace')
-        if result.stdout.strip():
-            print(f"{RED}Error: You have uncommitted changes{NC}")
-            print(f"{YELLOW}Please commit or stash your changes first{NC}")
-            return False
-    except subprocess.CalledProcessError as e:
-        print(f"{RED}Error checking git status: {e}{NC}")
+    if changes:
+        print(f"{RED}Error: You have uncommitted changes{NC}")
+        print(f"{YELLOW}Please commit or stash your changes first{NC}")
         return False
 
     # Step 1: Fetch latest changes (silent)
     result = subprocess.run(
         ["git", "fetch", "origin"],
         capture_output=True, text=True,
-        encoding='utf-8', errors='replace'
+        encoding='utf-8', errors='replace', env=_GIT_ENV
     )
     if result.returncode != 0:
         print(f"{RED}Failed to fetch latest changes{NC}")
@@ -567,9 +832,9 @@ def sync_branches(branch_names):
         result = subprocess.run(
             ["git", "rev-list", f"origin/{current_branch}..{current_branch}"],
             capture_output=True, text=True,
-            encoding='utf-8', errors='replace'
+            encoding='utf-8', errors='replace', env=_GIT_ENV
         )
-        unpushed_commits = result.stdout.strip().split('\n') if result.stdout.strip() else []
+        unpushed_commits = result.stdout.splitlines()
 
         if unpushed_commits and unpushed_commits[0]:
             had_unpushed = True
@@ -608,7 +873,8 @@ def sync_branches(branch_names):
             capture_output=True,
             text=True,
             encoding='utf-8',
-            errors='replace'
+            errors='replace',
+            env=_GIT_ENV
         )
 
         if merge_process.returncode == 0:
@@ -622,15 +888,7 @@ def sync_branches(branch_names):
         else:
             # Check for merge conflicts
             try:
-                result = subprocess.run(
-                    ["git", "diff", "--name-only", "--diff-filter=U"],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                    encoding='utf-8',
-                    errors='replace'
-                )
-                conflicted_files = result.stdout.strip().split('\n') if result.stdout.strip() else []
+                conflicted_files = get_conflicted_files(merge_process.stdout + merge_process.stderr)
 
                 if conflicted_files:
                     print(f"{RED}✗ Merge conflict detected in {len(conflicted_files)} file(s):{NC}")
@@ -641,14 +899,23 @@ def sync_branches(branch_names):
 
                     valid_files = [f for f in conflicted_files if f]
                     if valid_files:
+                        # Launch without waiting for the code CLI to hand off to
+                        # VSCode; --reuse-window opens all files in one window
+                        code_path = shutil.which("code")
                         try:
-                            subprocess.run(["code"] + valid_files, check=True)
+                            if not code_path:
+                                raise FileNotFoundError("code")
+                            subprocess.Popen(
+                                [code_path, "--reuse-window"] + valid_files,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL
+                            )
                             print(f"{GREEN}✓ Opened all {len(valid_files)} file(s) in VSCode{NC}")
-                        except subprocess.CalledProcessError:
-                            print(f"{RED}✗ Failed to open files in VSCode{NC}")
                         except FileNotFoundError:
                             print(f"{RED}Error: VSCode (code) command not found{NC}")
                             print(f"{YELLOW}Please install VSCode CLI or resolve conflicts manually{NC}")
+                        except OSError:
+                            print(f"{RED}✗ Failed to open files in VSCode{NC}")
 
                     print(f"\n{YELLOW}Please resolve the conflicts in VSCode and then:{NC}")
                     print(f"  1. Stage the resolved files: {BLUE}git add <file>{NC}")
@@ -672,30 +939,96 @@ def sync_branches(branch_names):
         print(f"\n{RED}⚠ Sync stopped due to conflicts or errors{NC}")
         return False
 
-    # Step 4: Push current branch (silent if no changes)
-    if branches_with_changes:
-        push_result = subprocess.run(
-            ["git", "push", "origin", current_branch],
+    # Step 4: Move merged branches to current branch without checkout.
+    # Each merged branch is now an ancestor of current_branch, so merging
+    # current_branch into it is a fast-forward: update the refs directly
+    fast_forwarded = {}
+    if successfully_merged_branches:
+        result = subprocess.run(
+            ["git", "rev-parse", current_branch] + successfully_merged_branches,
             capture_output=True, text=True,
-            encoding='utf-8', errors='replace'
+            encoding='utf-8', errors='replace', env=_GIT_ENV
         )
-        if push_result.returncode != 0:
-            print(f"{RED}Failed to push {current_branch}{NC}")
-            return False
-        actions_taken.append(f"Pushed {current_branch} with merged changes")
+        shas = result.stdout.split()
+        if result.returncode == 0 and len(shas) == len(successfully_merged_branches) + 1:
+            current_sha = shas[0]
+            for branch_name, old_sha in zip(successfully_merged_branches, shas[1:]):
+                moved = fast_forward_branch(branch_name, current_sha, old_sha)
+                if moved is not None:
+                    fast_forwarded[branch_name] = moved
+
+    # Step 5: Push current branch (if it changed) and all fast-forwarded
+    # branches in one atomic push - one process, one remote negotiation
+    to_push = ([current_branch] if branches_with_changes else []) + list(fast_forwarded)
+    atomic_result = push_branches(to_push, atomic=True) if to_push else None
 
-    # Step 5: Push merged changes to source branches
     successfully_pushed_branches = []
     failed_push_branches = []
+    push_results = {}
 
+    if atomic_result is not None and atomic_result.returncode == 0:
+        if branches_with_changes:
+            actions_taken.append(f"Pushed {current_branch} with merged changes")
+        push_results = {name: (moved, atomic_result) for name, moved in fast_forwarded.items()}
+    else:
+        # Atomic push rejected (e.g. a remote branch has new commits) or not
+        # supported: push each branch on its own so the others still go through
+        if branches_with_changes:
+            push_result = push_branches([current_branch])
+            if push_result.returncode != 0:
+                print(f"{RED}Failed to push {current_branch}{NC}")
+                return False
+            actions_taken.append(f"Pushed {current_branch} with merged changes")
+
+        if fast_forwarded:
+            with ThreadPoolExecutor(max_workers=min(len(fast_forwarded), 8)) as executor:
+                futures = {
+                    branch_name: executor.submit(push_branches, [branch_name])
+                    for branch_name in fast_forwarded
+                }
+                push_results = {
+                    branch_name: (fast_forwarded[branch_name], future.result())
+                    for branch_name, future in futures.items()
+                }
+
+    needs_checkout = False
     for branch_name in successfully_merged_branches:
+        result = push_results.get(branch_name)
+        if result is None:
+            # Couldn't fast-forward the ref - fall back to checkout + merge below
+            needs_checkout = True
+            continue
+
+        branch_had_changes, push_result = result
+        if branch_had_changes:
+            changes_made = True
+            print(f"{GREEN}✓ Merged {current_branch} → {branch_name}{NC}")
+
+        if push_result.returncode == 0:
+            if branch_had_changes:
+                print(f"{GREEN}✓ Pushed {branch_name} to origin{NC}")
+                actions_taken.append(f"Updated {branch_name}")
+            successfully_pushed_branches.append(branch_name)
+        elif "non-fast-forward" in push_result.stderr or "rejected" in push_result.stderr:
+            # Remote has new changes - needs a real merge in the working tree
+            needs_checkout = True
+            push_results[branch_name] = None
+        else:
+            print(f"{RED}✗ Failed to push {branch_name}: {push_result.stderr}{NC}")
+            failed_push_branches.append(branch_name)
+
+    for branch_name in successfully_merged_branches:
+        if push_results.get(branch_name) is not None:
+            continue
+
         # Checkout the branch
         checkout_result = subprocess.run(
             ["git", "checkout", branch_name],
             capture_output=True,
             text=True,
             encoding='utf-8',
-            errors='replace'
+            errors='replace',
+            env=_GIT_ENV
         )
 
         if checkout_result.returncode != 0:
@@ -709,12 +1042,13 @@ def sync_branches(branch_names):
             capture_output=True,
             text=True,
             encoding='utf-8',
-            errors='replace'
+            errors='replace',
+            env=_GIT_ENV
         )
 
         if merge_result.returncode != 0:
             print(f"{RED}✗ Failed to merge {current_branch} into {branch_name}{NC}")
-            subprocess.run(["git", "checkout", current_branch], capture_output=True)
+            subprocess.run(["git", "checkout", current_branch], capture_output=True, env=_GIT_ENV)
             failed_push_branches.append(branch_name)
             continue
 
@@ -732,7 +1066,8 @@ def sync_branches(branch_names):
             capture_output=True,
             text=True,
             encoding='utf-8',
-            errors='replace'
+            errors='replace',
+            env=_GIT_ENV
         )
 
         if push_result.returncode == 0:
@@ -751,7 +1086,8 @@ def sync_branches(branch_names):
                     capture_output=True,
                     text=True,
                     encoding='utf-8',
-                    errors='replace'
+                    errors='replace',
+                    env=_GIT_ENV
                 )
 
                 if pull_result.returncode != 0:
@@ -765,7 +1101,8 @@ def sync_branches(branch_names):
                     capture_output=True,
                     text=True,
                     encoding='utf-8',
-                    errors='replace'
+                    errors='replace',
+                    env=_GIT_ENV
                 )
 
                 if push_retry.returncode == 0:
@@ -780,7 +1117,8 @@ def sync_branches(branch_names):
                 failed_push_branches.append(branch_name)
 
     # Return to current branch (silent)
-    subprocess.run(["git", "checkout", current_branch], capture_output=True)
+    if needs_checkout:
+        subprocess.run(["git", "checkout", current_branch], capture_output=True, env=_GIT_ENV)
 
     # Summary - compact if no changes, detailed if changes made
     if not changes_made and not failed_push_branches:
@@ -827,23 +1165,17 @@ def deploy_to_deployment():
     changes_made = False
     actions_taken = []
 
-    # Check if git repository
-    try:
-        subprocess.run(["git", "status"], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
+    # Check if git repository, get current branch and uncommitted changes in one call
+    status = get_repo_status()
+    if status is None:
         print(f"{RED}Error: Not a git repository or git not available{NC}")
         return False
 
-    # Get current branch name
-    try:
-        result = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                              capture_output=True, text=True, check=True,
-                              encoding='utf-8', errors='replace')
-        current_branch = result.stdout.strip()
-        print(f"{BLUE}Current branch: {current_branch}{NC}")
-    except subprocess.CalledProcessError as e:
-        print(f"{RED}Error getting current branch: {e}{NC}")
+    current_branch, changes = status
+    if not current_branch:
+        print(f"{RED}Error getting current branch{NC}")
         return False
+    print(f"{BLUE}Current branch: {current_branch}{NC}")
 
     # Check if current branch is deployment
     if current_branch == "deployment":
@@ -852,23 +1184,16 @@ def deploy_to_deployment():
         return False
 
     # Check for uncommitted changes
-    try:
-        result = subprocess.run(["git", "status", "--porcelain"],
-                              capture_output=True, text=True, check=True,
-                              encoding='utf-8', errors='replace')
-        if result.stdout.strip():
-            print(f"{RED}Error: You have uncommitted changes{NC}")
-            print(f"{YELLOW}Please commit or stash your changes first{NC}")
-            return False
-    except subprocess.CalledProcessError as e:
-        print(f"{RED}Error checking git status: {e}{NC}")
+    if changes:
+        print(f"{RED}Error: You have uncommitted changes{NC}")
+        print(f"{YELLOW}Please commit or stash your changes first{NC}")
         return False
 
     # Fetch latest changes (silent)
     result = subprocess.run(
         ["git", "fetch", "origin"],
         capture_output=True, text=True,
-        encoding='utf-8', errors='replace'
+        encoding='utf-8', errors='replace', env=_GIT_ENV
     )
     if result.returncode != 0:
         print(f"{RED}Failed to fetch latest changes{NC}")
@@ -879,9 +1204,9 @@ def deploy_to_deployment():
         result = subprocess.run(
             ["git", "rev-list", f"origin/{current_branch}..{current_branch}"],
             capture_output=True, text=True,
-            encoding='utf-8', errors='replace'
+            encoding='utf-8', errors='replace', env=_GIT_ENV
         )
-        unpushed_commits = result.stdout.strip().split('\n') if result.stdout.strip() else []
+        unpushed_commits = result.stdout.splitlines()
 
         if unpushed_commits and unpushed_commits[0]:
             changes_made = True
@@ -911,7 +1236,7 @@ def deploy_to_deployment():
     checkout_result = subprocess.run(
         ["git", "checkout", "deployment"],
         capture_output=True, text=True,
-        encoding='utf-8', errors='replace'
+        encoding='utf-8', errors='replace', env=_GIT_ENV
     )
     if checkout_result.returncode != 0:
         print(f"{RED}Failed to checkout deployment{NC}")
@@ -921,11 +1246,11 @@ def deploy_to_deployment():
     pull_result = subprocess.run(
         ["git", "pull", "origin", "deployment"],
         capture_output=True, text=True,
-        encoding='utf-8', errors='replace'
+        encoding='utf-8', errors='replace', env=_GIT_ENV
     )
     if pull_result.returncode != 0:
         print(f"{RED}Failed to pull latest deployment{NC}")
-        subprocess.run(["git", "checkout", current_branch], capture_output=True)
+        subprocess.run(["git", "checkout", current_branch], capture_output=True, env=_GIT_ENV)
         return False
 
     # Merge current branch into deployment
@@ -934,7 +1259,8 @@ def deploy_to_deployment():
         capture_output=True,
         text=True,
         encoding='utf-8',
-        errors='replace'
+        errors='replace',
+        env=_GIT_ENV
     )
 
     if merge_result.returncode != 0:
@@ -964,7 +1290,7 @@ def deploy_to_deployment():
         push_result = subprocess.run(
             ["git", "push", "origin", "deployment"],
             capture_output=True, text=True,
-            encoding='utf-8', errors='replace'
+            encoding='utf-8', errors='replace', env=_GIT_ENV
         )
         if push_result.returncode != 0:
             print(f"{RED}Failed to push to remote{NC}")
@@ -973,7 +1299,7 @@ def deploy_to_deployment():
         print(f"{GREEN}✓ Pushed deployment to origin{NC}")
 
     # Checkout back to original branch (silent)
-    subprocess.run(["git", "checkout", current_branch], capture_output=True)
+    subprocess.run(["git", "checkout", current_branch], capture_output=True, env=_GIT_ENV)
 
     # Summary - compact if no changes
     if not changes_made:
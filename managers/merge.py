@@ -4,6 +4,9 @@ File Merge Tool - Merges multiple files into a single output file
 """
 
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
 from common_utils import (
     timer_decorator,
@@ -16,53 +19,186 @@ from common_utils import (
 )
 
 
-def merge_files_recursively(source_folder, output_file, base_path=""):
-    processed_files = 0
-    failed_files = 0
+# Separator written after every merged file
+FILE_SEPARATOR = b"\n\n=====================\n\n"
+
+# Output buffer size - merged files are small, so most land in one write
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Threads reading input files concurrently
+MERGE_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# No newline translation on Windows for raw os.open reads
+_O_BINARY = getattr(os, 'O_BINARY', 0)
 
+# Directories never descended into when merging a folder (VCS data,
+# build output and tool caches)
+MERGE_IGNORED_DIRS = frozenset({'.git', '.dart_tool', 'build', 'node_modules', '.idea'})
+
+
+class BinaryFileError(Exception):
+    """Raised for files that are not valid UTF-8 text"""
+
+
+def _walk_files(top):
+    """
+    Walk top with os.scandir, yielding (dirpath, filenames) in the same
+    top-down order as os.walk. DirEntry type checks reuse the data from the
+    directory listing, and directories in MERGE_IGNORED_DIRS (or symlinked
+    directories, like os.walk) are not descended into
+    """
+    try:
+        with os.scandir(top) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    filenames = []
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if not is_dir:
+            filenames.append(entry.name)
+        elif entry.name not in MERGE_IGNORED_DIRS and not entry.is_symlink():
+            subdirs.append(entry.path)
+
+    yield top, filenames
+    for path in subdirs:
+        yield from _walk_files(path)
+
+
+def collect_folder_files(source_folder, base_path=""):
+    """
+    List the files of a folder to merge, in walk order
+    Returns: (files, failed) - files is a list of (file_path, display_name)
+             tuples, failed is 1 if the folder doesn't exist
+    """
     if not os.path.exists(source_folder):
         print(f"{RED}❌ Error: Source folder '{source_folder}' does not exist!{NC}")
-        return 0, 1
+        return [], 1
 
     print(f"{BLUE}📁 Processing folder: {source_folder}{NC}")
 
-    for root, dirs, files in os.walk(source_folder):
+    files_to_merge = []
+    for root, files in _walk_files(source_folder):
         relative_path = os.path.relpath(root, base_path) if base_path else ""
         for filename in files:
             file_path = os.path.join(root, filename)
             rel_file_path = os.path.join(relative_path, filename) if base_path else filename
+            files_to_merge.append((file_path, rel_file_path))
+
+    return files_to_merge, 0
+
+
+def _read_bytes(file_path):
+    """
+    Read a whole file with as few syscalls as possible: open, fstat and a
+    single read of st_size + 1 bytes (the extra byte detects EOF), with no
+    buffered reader setup. Files that grow or report no size (procfs, pipes)
+    are read to EOF in chunks
+    """
+    fd = os.open(file_path, os.O_RDONLY | _O_BINARY)
+    try:
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size + 1)
+        if size and len(data) <= size:
+            return data
+        chunks = [data]
+        while True:
+            chunk = os.read(fd, OUTPUT_BUFFER_SIZE)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+
+def read_file_content(file_path):
+    """
+    Read one file to merge (runs in a worker thread)
+    Returns: (content, error) - the raw bytes and None, or None and the
+             exception; binary (non UTF-8) files are reported as BinaryFileError
+    """
+    try:
+        content = _read_bytes(file_path)
+    except Exception as e:
+        return None, e
+    # Raw bytes are copied as is; only check they are text. The decode
+    # error holds a reference to the bytes, so report a fresh one instead
+    try:
+        content.decode("utf-8")
+    except UnicodeDecodeError:
+        return None, BinaryFileError("Binary file - content skipped")
+    return content, None
+
+
+def append_file_content(outfile, display_name, read_result):
+    """
+    Append one file to the merged output
+    Parameters:
+        outfile: Output file, already open in binary append mode
+        display_name: Name written in the file header
+        read_result: (content, error) tuple from read_file_content
+    """
+    content, error = read_result
+    outfile.write(f"File Name : {display_name}\n\n".encode("utf-8"))
+    if isinstance(error, BinaryFileError):
+        # Binary file - skip the content
+        outfile.write(f"File Name : {display_name} [Binary file - content skipped]\n\n".encode("utf-8"))
+        outfile.write(FILE_SEPARATOR)
+        raise error
+    if error is not None:
+        outfile.write(f"File Name : {display_name} [ERROR: {error}]\n\n".encode("utf-8"))
+        outfile.write(FILE_SEPARATOR)
+        raise error
+    outfile.write(content)
+    outfile.write(FILE_SEPARATOR)
+
+
+def merge_file_list(files_to_merge, output_file):
+    """
+    Merge files into output_file. Files are read concurrently by a thread
+    pool (the reads are I/O bound and release the GIL) and written in list
+    order through one buffered handle
+    Parameters:
+        files_to_merge: List of (file_path, display_name, label) tuples;
+                        label is the name shown in progress messages
+        output_file: Output file path (appended to)
+    Returns: (processed, failed) counts
+    """
+    processed_files = 0
+    failed_files = 0
+    if not files_to_merge:
+        return 0, 0
+
+    workers = min(MERGE_READ_WORKERS, len(files_to_merge))
+    # Keep at most this many reads in flight so memory stays bounded
+    window = workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as executor, \
+            open(output_file, "ab", buffering=OUTPUT_BUFFER_SIZE) as outfile:
+        pending = deque()
+        entries = iter(files_to_merge)
+        for entry in islice(entries, window):
+            pending.append((entry, executor.submit(read_file_content, entry[0])))
+        while pending:
+            # Drain in submission order, topping the window back up
+            (file_path, display_name, label), future = pending.popleft()
+            for entry in islice(entries, 1):
+                pending.append((entry, executor.submit(read_file_content, entry[0])))
             try:
-                append_file_content(file_path, output_file, rel_file_path)
+                append_file_content(outfile, display_name, future.result())
                 processed_files += 1
-                print(f"{GREEN}✅ Processed: {rel_file_path}{NC}")
+                print(f"{GREEN}✅ Processed: {label}{NC}")
             except Exception as e:
                 failed_files += 1
-                print(f"{RED}❌ Failed to process {rel_file_path}: {e}{NC}")
+                print(f"{RED}❌ Failed to process {label}: {e}{NC}")
 
     return processed_files, failed_files
 
 
-def append_file_content(file_path, output_file, display_name):
-    try:
-        with open(output_file, "a", encoding="utf-8") as outfile:
-            outfile.write(f"File Name : {display_name}\n\n")
-            with open(file_path, "r", encoding="utf-8") as infile:
-                content = infile.read()
-                outfile.write(content)
-            outfile.write("\n\n=====================\n\n")
-    except UnicodeDecodeError:
-        # Try with different encoding for binary files
-        with open(output_file, "a", encoding="utf-8") as outfile:
-            outfile.write(f"File Name : {display_name} [Binary file - content skipped]\n\n")
-            outfile.write("\n\n=====================\n\n")
-        raise Exception("Binary file - content skipped")
-    except Exception as e:
-        with open(output_file, "a", encoding="utf-8") as outfile:
-            outfile.write(f"File Name : {display_name} [ERROR: {e}]\n\n")
-            outfile.write("\n\n=====================\n\n")
-        raise
-
-
 def merge_specific_paths_from_file(paths_file, output_file):
     processed_files = 0
     failed_files = 0
@@ -88,25 +224,25 @@ def merge_specific_paths_from_file(paths_file, output_file):
         if os.path.isfile(common_base):
             common_base = os.path.dirname(common_base)
 
+        # Build the flat file list first, then read and write in one pass
+        files_to_merge = []
         for path in paths:
             if os.path.isdir(path):
-                p_files, f_files = merge_files_recursively(path, output_file, base_path=common_base)
-                processed_files += p_files
+                folder_files, f_files = collect_folder_files(path, base_path=common_base)
+                files_to_merge.extend((file_path, rel, rel) for file_path, rel in folder_files)
                 failed_files += f_files
             elif os.path.isfile(path):
                 # Get relative path from common base
                 display_name = os.path.relpath(path, common_base)
-                try:
-                    append_file_content(path, output_file, display_name)
-                    processed_files += 1
-                    print(f"{GREEN}✅ Processed: {path}{NC}")
-                except Exception as e:
-                    failed_files += 1
-                    print(f"{RED}❌ Failed to process {path}: {e}{NC}")
+                files_to_merge.append((path, display_name, path))
             else:
                 print(f"{YELLOW}⚠️  Warning: Path does not exist: {path}{NC}")
                 failed_files += 1
 
+        p_files, f_files = merge_file_list(files_to_merge, output_file)
+        processed_files += p_files
+        failed_files += f_files
+
         return processed_files, failed_files
 
     except Exception as e:
@@ -11,53 +11,15 @@ from common_utils import (
     is_windows, is_macos, is_linux,
 )
 from core.constants import PATTERNS
-from core.state import get_selected_device, set_selected_device, clear_selected_device
+from core.state import get_selected_device, clear_selected_device
 from managers.device import (
-    get_usb_devices,
+    get_all_connected_devices,
+    select_usb_device,
     ensure_device_connected,
     build_adb_cmd,
 )
 
 
-def select_usb_device_for_wireless():
-    """
-    Prompt user to select a USB device if multiple are connected.
-    Sets the selected device.
-    Returns: True if device selected/available, False if no devices
-    """
-    devices = get_usb_devices()
-
-    if not devices:
-        return False
-
-    if len(devices) == 1:
-        # Only one USB device, auto-select it
-        set_selected_device(devices[0])
-        return True
-
-    # Multiple USB devices found, ask user to select
-    print(f"\n{YELLOW}Multiple USB devices detected:{NC}")
-    for i, device in enumerate(devices, 1):
-        print(f"  {i}. {device}")
-
-    print()
-    while True:
-        try:
-            choice = input(f"Select USB device (1-{len(devices)}): ").strip()
-            index = int(choice) - 1
-            if 0 <= index < len(devices):
-                set_selected_device(devices[index])
-                print(f"{GREEN}✓ Selected: {devices[index]}{NC}\n")
-                return True
-            else:
-                print(f"{RED}Invalid choice. Please enter a number between 1 and {len(devices)}{NC}")
-        except ValueError:
-            print(f"{RED}Invalid input. Please enter a number{NC}")
-        except KeyboardInterrupt:
-            print(f"\n{YELLOW}Selection cancelled{NC}")
-            return False
-
-
 def setup_wireless_adb():
     """
     Setup wireless ADB connection
@@ -66,7 +28,7 @@ def setup_wireless_adb():
     print(f"{YELLOW}Setting up Wireless ADB...{NC}\n")
 
     # Check if USB device is connected and select it
-    if not select_usb_device_for_wireless():
+    if not select_usb_device():
         print(f"{RED}Error: No device connected via USB!{NC}")
         print(f"{YELLOW}Please connect your device via USB first{NC}")
         return False
@@ -119,6 +81,9 @@ def setup_wireless_adb():
         print(f"{YELLOW}Error: {result.stderr}{NC}")
         return False
 
+    # The device restarts adbd in TCP/IP mode, so the cached device list is stale
+    get_all_connected_devices.cache_clear()
+
     print(f"{GREEN}✓ TCP/IP mode enabled{NC}")
     print(f"\n{YELLOW}You can now disconnect the USB cable{NC}")
     input("Press Enter after disconnecting USB cable...")
@@ -135,6 +100,7 @@ def setup_wireless_adb():
         encoding='utf-8',
         errors='replace'
     )
+    get_all_connected_devices.cache_clear()
 
     if result.returncode == 0 and "connected" in result.stdout.lower():
         print(f"{GREEN}✓ Wireless ADB connected successfully!{NC}")
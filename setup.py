@@ -56,7 +56,7 @@ def get_dependencies_from_requirements():
 
     # Fallback to hardcoded list if requirements.txt not found or empty
     if not dependencies:
-        dependencies = ['python-dotenv', 'requests']
+        dependencies = ['requests']
 
     return dependencies
 